@@ -31,7 +31,7 @@ from .client import (
 )
 from .client import (
     VIDEO_PORT, AUDIO_PORT, CTRL_PORT, PUSH_PORT, EVENT_PORT, IP_PORT,
-    DEFAULT_BUF_SIZE,
+    DEFAULT_BUF_SIZE, RECV_BUF_SIZE,
     SWITCH_ON, SWITCH_OFF,
     MODE_CHASSIS_LEAD, MODE_GIMBAL_LEAD, MODE_FREE,
     ARMOR_HIT,
@@ -39,4 +39,4 @@ from .client import (
     LED_ALL, LED_TOP_ALL, LED_TOP_RIGHT, LED_TOP_LEFT, LED_BOTTOM_ALL, LED_BOTTOM_FRONT, LED_BOTTOM_BACK, LED_BOTTOM_LEFT, LED_BOTTOM_RIGHT,
     LED_EFFECT_SOLID, LED_EFFECT_OFF, LED_EFFECT_PULSE, LED_EFFECT_BLINK, LED_EFFECT_SCROLLING,
 )
-from .client import get_broadcast_ip, Commander
+from .client import get_broadcast_ip, get_broadcast_ips, Commander, AsyncCommander, AsyncCommanderPool
@@ -7,15 +7,22 @@
 # ██║  ██║╚██████╔╝██████╔╝╚██████╔╝██║ ╚═╝ ██║██║  ██║███████║   ██║   ███████╗██║  ██║██║        ██║
 # ╚═╝  ╚═╝ ╚═════╝ ╚═════╝  ╚═════╝ ╚═╝     ╚═╝╚═╝  ╚═╝╚══════╝   ╚═╝   ╚══════╝╚═╝  ╚═╝╚═╝        ╚═╝
 
+import asyncio
+import collections
+import functools
 import logging
 import multiprocessing as mp
+import os
 import socket
-from typing import Optional
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
 
 from dataclasses import dataclass
 
 CTX = mp.get_context('spawn')
 LOG_LEVEL = logging.DEBUG
+_LOGGER = logging.getLogger(__name__)
 
 VIDEO_PORT: int = 40921
 AUDIO_PORT: int = 40922
@@ -25,6 +32,9 @@ EVENT_PORT: int = 40925
 IP_PORT: int = 40926
 
 DEFAULT_BUF_SIZE: int = 512
+# Commander接收缓冲区大小
+# size of Commander's receive buffer
+RECV_BUF_SIZE: int = 4096
 
 # switch_enum
 SWITCH_ON: str = 'on'
@@ -35,14 +45,17 @@ MODE_CHASSIS_LEAD: str = 'chassis_lead'
 MODE_GIMBAL_LEAD: str = 'gimbal_lead'
 MODE_FREE: str = 'free'
 MODE_ENUMS = (MODE_CHASSIS_LEAD, MODE_GIMBAL_LEAD, MODE_FREE)
+_MODE_SET = frozenset(MODE_ENUMS)
 
 # armor_event_attr_enum
 ARMOR_HIT: str = 'hit'
 ARMOR_ENUMS = (ARMOR_HIT,)
+_ARMOR_SET = frozenset(ARMOR_ENUMS)
 
 # sound_event_attr_enum
 SOUND_APPLAUSE: str = 'applause'
 SOUND_ENUMS = (SOUND_APPLAUSE,)
+_SOUND_SET = frozenset(SOUND_ENUMS)
 
 # led_comp_enum
 LED_ALL = 'all'
@@ -57,6 +70,8 @@ LED_BOTTOM_RIGHT = 'bottom_right'
 LED_ENUMS = (LED_ALL, LED_TOP_ALL, LED_TOP_RIGHT, LED_TOP_LEFT,
              LED_BOTTOM_ALL, LED_BOTTOM_FRONT, LED_BOTTOM_BACK,
              LED_BOTTOM_LEFT, LED_BOTTOM_RIGHT)
+_LED_SET = frozenset(LED_ENUMS)
+_LED_GIMBAL_SET = frozenset((LED_TOP_ALL, LED_TOP_LEFT, LED_TOP_RIGHT))
 
 # led_effect_enum
 LED_EFFECT_SOLID = 'solid'
@@ -67,10 +82,94 @@ LED_EFFECT_SCROLLING = 'scrolling'
 LED_EFFECT_ENUMS = (LED_EFFECT_SOLID, LED_EFFECT_OFF,
                     LED_EFFECT_PULSE, LED_EFFECT_BLINK,
                     LED_EFFECT_SCROLLING)
+_LED_EFFECT_SET = frozenset(LED_EFFECT_ENUMS)
+
+# 推送支持的频率
+# supported push frequencies
+_VALID_FREQS = frozenset((1, 5, 10, 20, 30, 50))
+
+# Windows上没有sendmsg
+# sendmsg is not available on Windows
+_HAS_SENDMSG: bool = hasattr(socket.socket, 'sendmsg')
+
+
+def _iov_max() -> int:
+    try:
+        iov_max = os.sysconf('SC_IOV_MAX')
+    except (AttributeError, ValueError, OSError):
+        return 1024
+    # -1表示没有限制或无法确定
+    # -1 means no limit or indeterminate
+    return iov_max if iov_max > 0 else 1024
+
+
+# 单次sendmsg最多能携带的缓冲区数目，Linux上为1024
+# max number of buffers one sendmsg call can carry, 1024 on Linux
+_IOV_MAX: int = _iov_max()
+
+_OK: bytes = b'ok'
+_OK_SPACED: bytes = b'ok '
+
+# 高频控制命令的预编码模板，参数经 _encode_arg() 编码，与 str() 的结果一致
+# pre-encoded templates for high frequency control commands, arguments are encoded by _encode_arg(), same as str()
+_CHASSIS_SPEED_TPL: bytes = b'chassis speed x %b y %b z %b;'
+_CHASSIS_WHEEL_TPL: bytes = b'chassis wheel w1 %b w2 %b w3 %b w4 %b;'
+_GIMBAL_SPEED_TPL: bytes = b'gimbal speed p %b y %b;'
+_LED_CONTROL_TPL: bytes = b'led control comp %b r %b g %b b %b effect %b;'
+_ROBOT_MODE_TPL: bytes = b'robot mode %b;'
+
+# 各枚举值的编码结果
+# encoded form of all enum values
+_ENUM_BYTES: Dict[str, bytes] = {
+    enum: enum.encode() for enum in MODE_ENUMS + ARMOR_ENUMS + SOUND_ENUMS + LED_ENUMS + LED_EFFECT_ENUMS
+}
+
+# 底盘推送开关命令，按(position, attitude, status)位掩码预先生成
+# chassis push switch commands, pre-built by bitmask of (position, attitude, status)
+_CHASSIS_PUSH_ALL_TPL: bytes = b'chassis push freq %b;'
+_CHASSIS_PUSH_ON_TPLS: Dict[int, bytes] = {
+    mask: b'chassis push' + b''.join(part for i, part in enumerate((
+        b' position on pfreq %b',
+        b' attitude on afreq %b',
+        b' status on sfreq %b',
+    )) if mask >> i & 1) + b';'
+    for mask in range(1, 8)
+}
+_CHASSIS_PUSH_OFF_CMDS: Dict[int, bytes] = {
+    mask: b'chassis push' + b''.join(part for i, part in enumerate((
+        b' position off',
+        b' attitude off',
+        b' status off',
+    )) if mask >> i & 1) + b';'
+    for mask in range(1, 8)
+}
+
+# 开关类命令，按 (关, 开) 排列，以bool为下标
+# switch commands, ordered as (off, on) and indexed by bool
+_STREAM_CMDS = (b'stream off;', b'stream on;')
+_AUDIO_CMDS = (b'audio off;', b'audio on;')
+_IR_SENSOR_MEASURE_CMDS = (b'ir_distance_sensor measure off;', b'ir_distance_sensor measure on;')
+_ARMOR_EVENT_CMDS: Dict[str, tuple] = {
+    attr: (b'armor event %b off;' % _ENUM_BYTES[attr], b'armor event %b on;' % _ENUM_BYTES[attr]) for attr in ARMOR_ENUMS
+}
+_SOUND_EVENT_CMDS: Dict[str, tuple] = {
+    attr: (b'sound event %b off;' % _ENUM_BYTES[attr], b'sound event %b on;' % _ENUM_BYTES[attr]) for attr in SOUND_ENUMS
+}
+_GIMBAL_PUSH_OFF_CMD: bytes = b'gimbal push attitude off;'
+
+# 遥测查询命令，返回值直接按bytes解析
+# telemetry queries, whose responses are parsed as bytes directly
+_CHASSIS_SPEED_QUERY: bytes = b'chassis speed ?;'
+_CHASSIS_POSITION_QUERY: bytes = b'chassis position ?;'
+_CHASSIS_ATTITUDE_QUERY: bytes = b'chassis attitude ?;'
+_CHASSIS_STATUS_QUERY: bytes = b'chassis status ?;'
+_GIMBAL_ATTITUDE_QUERY: bytes = b'gimbal attitude ?;'
 
 
 @dataclass
 class ChassisSpeed:
+    __slots__ = ('x', 'y', 'z', 'w1', 'w2', 'w3', 'w4')
+
     x: float
     y: float
     z: float
@@ -82,6 +181,8 @@ class ChassisSpeed:
 
 @dataclass
 class ChassisPosition:
+    __slots__ = ('x', 'y', 'z')
+
     x: float
     y: float
     z: Optional[float]
@@ -89,6 +190,8 @@ class ChassisPosition:
 
 @dataclass
 class ChassisAttitude:
+    __slots__ = ('pitch', 'roll', 'yaw')
+
     pitch: float
     roll: float
     yaw: float
@@ -96,6 +199,9 @@ class ChassisAttitude:
 
 @dataclass
 class ChassisStatus:
+    __slots__ = ('static', 'uphill', 'downhill', 'on_slope', 'pick_up', 'slip',
+                 'impact_x', 'impact_y', 'impact_z', 'roll_over', 'hill_static')
+
     # 是否静止
     static: bool
     # 是否上坡
@@ -119,73 +225,201 @@ class ChassisStatus:
     # 是否在坡上静止
     hill_static: bool
 
+    @property
+    def mask(self) -> int:
+        """
+        将状态压缩为整数位掩码，第i位对应第i个字段，便于大量记录时紧凑存储，如 ``array.array('H')``.
+
+        Pack status into an integer bitmask, bit i stands for the i-th field.
+        Handy for compact storage of long histories, e.g. ``array.array('H')``.
+        """
+        mask = 0
+        for i, name in enumerate(self.__slots__):
+            if getattr(self, name):
+                mask |= 1 << i
+        return mask
+
+    @classmethod
+    def from_mask(cls, mask: int) -> 'ChassisStatus':
+        """
+        从位掩码还原状态，是 mask 的逆操作。
+
+        Restore status from a bitmask, the inverse of mask.
+        """
+        return cls(*[bool(mask >> i & 1) for i in range(len(cls.__slots__))])
+
 
 @dataclass
 class GimbalAttitude:
+    __slots__ = ('pitch', 'yaw')
+
     pitch: float
     yaw: float
 
 
 @dataclass
 class ArmorHitEvent:
+    __slots__ = ('index', 'type')
+
     index: int
     type: int
 
 
 @dataclass
 class SoundApplauseEvent:
+    __slots__ = ('count',)
+
     count: int
 
 
+def _iter_broadcast_ips(timeout: float = None):
+    # 逐个产出广播中的IP，端口上与广播格式不符的数据会被忽略，超时则raise socket.timeout
+    # yield IPs from broadcasts, skipping stray datagrams, raise socket.timeout when time is up
+    BROADCAST_INITIAL: bytes = b'robot ip '
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    conn = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    conn.bind(('', IP_PORT))
+    try:
+        while True:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout('timed out waiting for IP broadcast')
+                conn.settimeout(remaining)
+            msg, (ip, port) = conn.recvfrom(DEFAULT_BUF_SIZE)
+            if msg.startswith(BROADCAST_INITIAL) and msg[len(BROADCAST_INITIAL):] == ip.encode():
+                yield ip
+    finally:
+        conn.close()
+
+
 def get_broadcast_ip(timeout: float = None) -> str:
     """
-    接收广播以获取机甲IP
+    接收广播以获取机甲IP，端口上与广播格式不符的数据会被忽略。
 
-    Receive broadcasting IP of Robomaster.
+    Receive broadcasting IP of Robomaster. Stray datagrams which do not look like a broadcast are skipped.
 
     :param timeout: 等待超时（秒）。 timeout in second
     :return: 机甲IP地址。IP of Robomaster.
     """
-    BROADCAST_INITIAL: str = 'robot ip '
+    ips = _iter_broadcast_ips(timeout)
+    try:
+        return next(ips)
+    finally:
+        ips.close()
 
-    conn = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    conn.bind(('', IP_PORT))
-    conn.settimeout(timeout)
-    msg, ip, port = None, None, None
+
+def get_broadcast_ips(n: int = 8, timeout: float = None) -> List[str]:
+    """
+    在一个socket上持续接收广播，收集多台机甲的IP，
+    收集到n个不同IP或超时即返回，不必为每台机甲重新创建socket。
+
+    Receive broadcasts on one socket and collect IPs of multiple Robomasters,
+    returning once n distinct IPs are found or time is up,
+    so there is no need to recreate the socket for each Robomaster.
+
+    :param n: 最多收集的IP数量。 the most IPs to collect.
+    :param timeout: 等待超时（秒），为None时一直等到收集到n个IP。 timeout in second, None for waiting until n IPs are found.
+    :return: 按发现顺序排列的机甲IP，超时时可能少于n个。 IPs of Robomasters in order of discovery, fewer than n on timeout.
+    """
+    if n <= 0:
+        raise ValueError(f'n {n} should be positive')
+    found: List[str] = []
+    ips = _iter_broadcast_ips(timeout)
     try:
-        msg, (ip, port) = conn.recvfrom(DEFAULT_BUF_SIZE)
+        for ip in ips:
+            if ip not in found:
+                found.append(ip)
+                if len(found) >= n:
+                    break
+    except socket.timeout:
+        pass
     finally:
-        conn.close()
-    msg = msg.decode()
-    assert len(msg) > len(BROADCAST_INITIAL), f'broken msg from {ip}:{port}: {msg}'
-    msg = msg[len(BROADCAST_INITIAL):]
-    assert msg == ip, f'unmatched source({ip}) and reported IP({msg})'
-    return msg
+        ips.close()
+    return found
+
+
+@functools.lru_cache(maxsize=256, typed=True)
+def _encode_hashable_arg(arg) -> bytes:
+    # 命令参数集中在少数取值上（停车的0，LED的0~255等），缓存其编码结果
+    # command arguments cluster around a few values (0 for stopping, 0~255 for LEDs, etc.), so cache their encoding
+    return str(arg).encode()
+
+
+def _encode_arg(arg) -> bytes:
+    try:
+        return _encode_hashable_arg(arg)
+    except TypeError:
+        # 不可哈希的参数无法缓存，直接编码
+        # unhashable arguments can not be cached, encode them directly
+        return str(arg).encode()
+
+
+class _NoLock:
+    """
+    单线程场景下代替锁的空上下文。
+
+    no-op stand-in for a lock under single threaded usage.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
 
 
 class Commander:
-    def __init__(self, ip: str = '', timeout: float = 30):
+    # 控制命令和返回都很短，内核缓冲区不需要很大
+    # commands and responses are short, kernel buffers need not be large
+    SNDBUF_SIZE: int = 4096
+    RCVBUF_SIZE: int = 8192
+    # fire_and_forget()最多积攒的未读返回数量
+    # the most unread responses fire_and_forget() lets pile up
+    MAX_UNACKED: int = 64
+
+    def __init__(self, ip: str = '', timeout: float = 30, thread_safe: bool = True):
         """
         创建SDK实例并连接机甲，实例在创建后立即可用。
 
         Create a new SDK instance and connect it to Robomaster.
         Instance is available immediately after creation.
 
+        实例可以在同一进程的多个线程间共享，但不能跨进程共享，每个进程应创建自己的Commander.
+
+        An instance can be shared among threads of one process, but not across processes.
+        Create one Commander per process instead.
+
         :param ip: 可选，机甲IP，可在路由器模式下自动获取。 (Optional) IP of Robomaster, which can be detected automatically under router mode.
         :param timeout: 可选，TCP通讯超时（秒）。 (Optional) TCP timeout in second.
-        """
-        self._mu: mp.Lock = CTX.Lock()
-        with self._mu:
-            if ip == '':
-                ip = get_broadcast_ip(timeout)
-            self._ip: str = ip
-            self._closed: bool = False
-            self._conn: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self._timeout: float = timeout
-            self._conn.settimeout(self._timeout)
-            self._conn.connect((self._ip, CTRL_PORT))
-            resp = self._do('command')
-            assert self._is_ok(resp) or resp == 'Already in SDK mode', f'entering SDK mode: {resp}'
+        :param thread_safe: 可选，是否在多个线程间共享实例，仅在单线程中使用时可设为False以省去加锁。
+            (Optional) whether the instance is shared among threads. Set to False to skip locking when used by one thread only.
+        """
+        self._mu = threading.Lock() if thread_safe else _NoLock()
+        if ip == '':
+            ip = get_broadcast_ip(timeout)
+        self._ip: str = ip
+        self._closed: bool = False
+        self._rx: bytearray = bytearray(RECV_BUF_SIZE)
+        self._rx_view: memoryview = memoryview(self._rx)
+        self._rx_len: int = 0
+        self._tx: bytearray = bytearray()
+        self._unacked: int = 0
+        self._conn: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._timeout: float = timeout
+        self._conn.settimeout(self._timeout)
+        # 关闭Nagle算法，短命令立即发出
+        # disable Nagle so that short commands go out immediately
+        self._conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.SNDBUF_SIZE)
+        self._conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.RCVBUF_SIZE)
+        # 长时间空闲的连接上及时发现断线的机甲
+        # notice a vanished Robomaster on long idle connections
+        self._conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._conn.connect((self._ip, CTRL_PORT))
+        resp = self._do('command')
+        assert self._is_ok(resp) or resp == 'Already in SDK mode', f'entering SDK mode: {resp}'
 
     def close(self):
         """
@@ -196,28 +430,135 @@ class Commander:
         because there may be other Commander still active.
         """
         with self._mu:
-            self._conn.close()
+            if self._closed:
+                return
             self._closed = True
+            self._conn.close()
+            self._conn = None
 
     def __enter__(self):
         return self
 
-    def __exit__(self):
+    def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    def __del__(self):
+        # 兜底回收socket，避免脚本异常退出时泄漏文件描述符。
+        # safety net against leaking the socket when scripts crash.
+        try:
+            self.close()
+        except Exception:
+            pass
+
     @staticmethod
     def _is_ok(resp: str) -> bool:
         return resp == 'ok'
 
-    def _do(self, *args) -> str:
+    @staticmethod
+    def _encode(args) -> bytes:
+        return b' '.join(arg if isinstance(arg, bytes) else _encode_arg(arg) for arg in args) + b';'
+
+    def _recv_frame(self, raw: bool = False):
+        # 读取直到终止符，避免响应被拆分到多个TCP分段时被截断，
+        # 多余的数据留在缓冲区中供下一次读取。
+        # raw为真时返回bytes，不解码。
+        # read until the terminator, a response may be split across TCP segments,
+        # and what remains stays in buffer for the next read.
+        # bytes is returned without decoding when raw is true.
+        # 热路径上的属性先取到局部变量
+        # hot path attributes are bound to locals once
+        rx, view, rx_len = self._rx, self._rx_view, self._rx_len
+        recv_into = None
+        while True:
+            index = rx.find(b';', 0, rx_len)
+            if index >= 0:
+                frame = view[:index]
+                if frame == _OK or frame == _OK_SPACED:
+                    # 绝大多数返回是ok，不必解码
+                    # the vast majority of responses are ok, no decoding needed
+                    resp = _OK if raw else 'ok'
+                elif raw:
+                    resp = bytes(frame).strip(b' ;')
+                else:
+                    # 直接从缓冲区解码，不额外复制。
+                    # 返回值后面有时候会多一个迷之空格，
+                    # 为了可能的向后兼容，额外剔除终止符。
+                    # decode straight from the buffer without an intermediate copy.
+                    resp = str(frame, 'utf-8').strip(' ;')
+                frame.release()
+                remaining = rx_len - index - 1
+                rx[:remaining] = rx[index + 1:rx_len]
+                self._rx_len = remaining
+                return resp
+            if rx_len >= len(rx):
+                # 运行期的I/O状况，不能用assert，否则-O下会被误报为连接关闭
+                # a runtime I/O condition, not an assert, otherwise -O reports it as a closed connection
+                raise ConnectionError('response exceeds receive buffer')
+            if recv_into is None:
+                recv_into = self._conn.recv_into
+            n = recv_into(view[rx_len:])
+            if n == 0:
+                raise ConnectionError('connection closed by Robomaster')
+            rx_len += n
+            # 及时记账，recv超时时已读到的数据不会丢失
+            # keep the count current so that a timeout does not lose data already read
+            self._rx_len = rx_len
+
+    def _drain_acks(self):
+        # 读掉fire_and_forget()留下的返回，逐个记账，超时后仍能接着读
+        # consume responses left by fire_and_forget(), counting one by one so a timeout can resume later
+        while self._unacked:
+            resp = self._recv_frame(True)
+            self._unacked -= 1
+            if resp != _OK:
+                _LOGGER.warning('Commander: unacknowledged command failed: %s', resp)
+
+    def _do_raw(self, cmd, raw: bool = False):
+        assert not self._closed, 'connection is already closed'
+        self._conn.sendall(cmd)
+        if self._unacked:
+            self._drain_acks()
+        return self._recv_frame(raw)
+
+    def _build(self, args) -> bytearray:
         assert len(args) > 0, 'empty arg not accepted'
+        # 复用发送缓冲区拼装命令
+        # assemble the command in the reused send buffer
+        tx = self._tx
+        tx.clear()
+        for arg in args:
+            tx += arg if isinstance(arg, bytes) else _encode_arg(arg)
+            tx += b' '
+        tx[-1] = 0x3b  # ';'
+        return tx
+
+    def _do(self, *args) -> str:
+        return self._do_raw(self._build(args))
+
+    def _sendv(self, chunks: List[bytes]):
+        # 聚集写，由内核拼接各命令，不在用户态复制
+        # gather write, the kernel concatenates chunks so no copy in user space
+        if not _HAS_SENDMSG:
+            self._conn.sendall(b''.join(chunks))
+            return
+        # 超过IOV_MAX的批量需要分次发送，否则sendmsg报EMSGSIZE
+        # batches beyond IOV_MAX are sent in slices, otherwise sendmsg fails with EMSGSIZE
+        for start in range(0, len(chunks), _IOV_MAX):
+            group = chunks[start:start + _IOV_MAX]
+            sent = self._conn.sendmsg(group)
+            if sent < sum(map(len, group)):
+                # 很少见的部分写入
+                # rare partial write
+                self._conn.sendall(b''.join(group)[sent:])
+
+    def _do_many(self, cmds) -> List[str]:
+        assert len(cmds) > 0, 'empty command list not accepted'
+        assert all(len(args) > 0 for args in cmds), 'empty arg not accepted'
         assert not self._closed, 'connection is already closed'
-        cmd = ' '.join(map(str, args)) + ';'
-        self._conn.send(cmd.encode())
-        buf = self._conn.recv(DEFAULT_BUF_SIZE)
-        # 返回值后面有时候会多一个迷之空格，
-        # 为了可能的向后兼容，额外剔除终止符。
-        return buf.decode().strip(' ;')
+        self._sendv([self._encode(args) for args in cmds])
+        if self._unacked:
+            self._drain_acks()
+        return [self._recv_frame() for _ in cmds]
 
     def get_ip(self) -> str:
         """
@@ -242,6 +583,44 @@ class Commander:
         with self._mu:
             return self._do(*args)
 
+    def do_many(self, cmds: Sequence[Sequence]) -> List[str]:
+        """
+        批量执行多条命令，所有命令一次性发出，然后依次读取各自的返回，只需要一次往返。
+
+        Execute a batch of commands. All commands are sent at once,
+        then their responses are read in order, costing only one round trip.
+
+        :param cmds: 命令列表，每条命令是一个参数元组，如 ``[('gimbal', 'recenter'), ('blaster', 'fire')]``.
+            list of commands, each command is a tuple of arguments, e.g. ``[('gimbal', 'recenter'), ('blaster', 'fire')]``.
+        :return: 与命令一一对应的返回列表。 responses in the same order as commands.
+        """
+        with self._mu:
+            return self._do_many(cmds)
+
+    def fire_and_forget(self, *args):
+        """
+        发出命令但不等待返回，适合只关心最新设定值的高频控制循环，如遥控时持续更新底盘速度。
+        返回会在下一次普通命令之前，或积攒达到 MAX_UNACKED 条时被读掉，失败的返回只记录日志。
+
+        Send a command without waiting for its response.
+        Handy in high frequency control loops which care about the latest setpoint only,
+        e.g. updating chassis speed continuously under remote control.
+        Responses are consumed before the next regular command, or once MAX_UNACKED or more pile up.
+        Failed responses are only logged.
+
+        Usage::
+
+            cmd.fire_and_forget('chassis', 'speed', 'x', 0.5, 'y', 0, 'z', 0)
+
+        :param args: 命令内容。 command content.
+        """
+        with self._mu:
+            assert not self._closed, 'connection is already closed'
+            self._conn.sendall(self._build(args))
+            self._unacked += 1
+            if self._unacked >= self.MAX_UNACKED:
+                self._drain_acks()
+
     def version(self) -> str:
         """
         查询当前机甲的SDK版本。
@@ -261,8 +640,10 @@ class Commander:
         :param mode: 三种模式之一，见enum MODE_*。 Movement mode, refer to enum MODE_*
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert mode in MODE_ENUMS, f'unknown mode {mode}'
-        resp = self.do('robot', 'mode', mode)
+        if mode not in _MODE_SET:
+            raise ValueError(f'unknown mode {mode}')
+        with self._mu:
+            resp = self._do_raw(_ROBOT_MODE_TPL % _ENUM_BYTES[mode])
         assert self._is_ok(resp), f'robot_mode: {resp}'
         return resp
 
@@ -275,7 +656,7 @@ class Commander:
         :return: 三种模式之一，见enum MODE_*。 Movement mode, refer to enum MODE_*
         """
         resp = self.do('robot', 'mode', '?')
-        assert resp in MODE_ENUMS, f'unexpected robot mode result: {resp}'
+        assert resp in _MODE_SET, f'unexpected robot mode result: {resp}'
         return resp
 
     def chassis_speed(self, x: float = 0, y: float = 0, z: float = 0) -> str:
@@ -289,10 +670,10 @@ class Commander:
         :param z: z 轴向旋转速度，单位 °/s   rotation speed in z axis, in °/s
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert -3.5 <= x <= 3.5, f'x {x} is out of range'
-        assert -3.5 <= y <= 3.5, f'y {y} is out of range'
-        assert -600 <= z <= 600, f'z {z} is out of range'
-        resp = self.do('chassis', 'speed', 'x', x, 'y', y, 'z', z)
+        if not (-3.5 <= x <= 3.5 and -3.5 <= y <= 3.5 and -600 <= z <= 600):
+            raise ValueError(f'out of range: x {x}, y {y}, z {z}')
+        with self._mu:
+            resp = self._do_raw(_CHASSIS_SPEED_TPL % (_encode_arg(x), _encode_arg(y), _encode_arg(z)))
         assert self._is_ok(resp), f'chassis_speed: {resp}'
         return resp
 
@@ -305,10 +686,12 @@ class Commander:
         :return: x 轴向运动速度(m/s)，y 轴向运动速度(m/s)，z 轴向旋转速度(°/s)，w1 右前麦轮速度(rpm)，w2 左前麦轮速速(rpm)，w3 右后麦轮速度(rpm)，w4 左后麦轮速度(rpm)。
             speed in x axis(m/s), speed in y axis(m/s), rotation speed in z axis(°/s), w1(right front) wheel speed(rpm), w2(left front) wheel speed(rpm), w3(right back) wheel speed(rpm), w4(left back) wheel speed(rpm)
         """
-        resp = self.do('chassis', 'speed', '?')
-        ans = resp.split(' ')
+        with self._mu:
+            resp = self._do_raw(_CHASSIS_SPEED_QUERY, True)
+        ans = resp.split(b' ')
         assert len(ans) == 7, f'get_chassis_speed: {resp}'
-        return ChassisSpeed(x=float(ans[0]), y=float(ans[1]), z=float(ans[2]), w1=int(ans[3]), w2=int(ans[4]), w3=int(ans[5]), w4=int(ans[6]))
+        x, y, z, w1, w2, w3, w4 = ans
+        return ChassisSpeed(float(x), float(y), float(z), int(w1), int(w2), int(w3), int(w4))
 
     def chassis_wheel(self, w1: int = 0, w2: int = 0, w3: int = 0, w4: int = 0) -> str:
         """
@@ -322,9 +705,10 @@ class Commander:
         :param w4: 左后麦轮速度，单位 rpm   w4(left back) wheel speed(rpm)
         :return ok: ok，否则raise。 ok, or raise certain exception.
         """
-        for i, v in enumerate((w1, w2, w3, w4)):
-            assert -1000 <= v <= 1000, f'w{i + 1} {v} is out of range'
-        resp = self.do('chassis', 'wheel', 'w1', w1, 'w2', w2, 'w3', w3, 'w4', w4)
+        if not (-1000 <= w1 <= 1000 and -1000 <= w2 <= 1000 and -1000 <= w3 <= 1000 and -1000 <= w4 <= 1000):
+            raise ValueError(f'out of range: w1 {w1}, w2 {w2}, w3 {w3}, w4 {w4}')
+        with self._mu:
+            resp = self._do_raw(_CHASSIS_WHEEL_TPL % (_encode_arg(w1), _encode_arg(w2), _encode_arg(w3), _encode_arg(w4)))
         assert self._is_ok(resp), f'chassis_wheel: {resp}'
         return resp
 
@@ -341,11 +725,10 @@ class Commander:
         :param speed_z: z 轴向旋转速度， 单位 °/s   speed in z axis, in degree/second
         :return ok: ok，否则raise。 ok, or raise certain exception.
         """
-        assert -5 <= x <= 5, f'x {x} is out of range'
-        assert -5 <= y <= 5, f'y {y} is out of range'
-        assert -1800 <= z <= 1800, f'z {z} is out of range'
-        assert speed_xy is None or 0 < speed_xy <= 3.5, f'speed_xy {speed_xy} is out of range'
-        assert speed_z is None or 0 < speed_z <= 600, f'speed_z {speed_z} is out of range'
+        if not (-5 <= x <= 5 and -5 <= y <= 5 and -1800 <= z <= 1800):
+            raise ValueError(f'out of range: x {x}, y {y}, z {z}')
+        if not ((speed_xy is None or 0 < speed_xy <= 3.5) and (speed_z is None or 0 < speed_z <= 600)):
+            raise ValueError(f'out of range: speed_xy {speed_xy}, speed_z {speed_z}')
         cmd = ['chassis', 'move', 'x', x, 'y', y, 'z', z]
         if speed_xy is not None:
             cmd += ['vxy', speed_xy]
@@ -363,10 +746,11 @@ class Commander:
 
         :return: x 轴位置(m)，y 轴位置(m)，偏航角度(°)。 location consisting of x, y, z, in meter, meter, degree.
         """
-        resp = self.do('chassis', 'position', '?')
-        ans = resp.split(' ')
+        with self._mu:
+            resp = self._do_raw(_CHASSIS_POSITION_QUERY, True)
+        ans = resp.split(b' ')
         assert len(ans) == 3, f'get_chassis_position: {resp}'
-        return ChassisPosition(float(ans[0]), float(ans[1]), float(ans[2]))
+        return ChassisPosition(*map(float, ans))
 
     def get_chassis_attitude(self) -> ChassisAttitude:
         """
@@ -376,10 +760,11 @@ class Commander:
 
         :return: pitch 轴角度(°)，roll 轴角度(°)，yaw 轴角度(°)。   pitch, roll, yaw in degree.
         """
-        resp = self.do('chassis', 'attitude', '?')
-        ans = resp.split(' ')
+        with self._mu:
+            resp = self._do_raw(_CHASSIS_ATTITUDE_QUERY, True)
+        ans = resp.split(b' ')
         assert len(ans) == 3, f'get_chassis_attitude: {resp}'
-        return ChassisAttitude(float(ans[0]), float(ans[1]), float(ans[2]))
+        return ChassisAttitude(*map(float, ans))
 
     def get_chassis_status(self) -> ChassisStatus:
         """
@@ -389,10 +774,13 @@ class Commander:
 
         :return: 底盘状态，详见 ChassisStatus   chassis status, see class ChassisStatus.
         """
-        resp = self.do('chassis', 'status', '?')
-        ans = resp.split(' ')
-        assert len(ans) == 11, f'get_chassis_status: {resp}'
-        return ChassisStatus(*map(lambda x: bool(int(x)), ans))
+        with self._mu:
+            resp = self._do_raw(_CHASSIS_STATUS_QUERY, True)
+        # 各标志位只能是0或1，去掉空格后逐字节比较
+        # every flag must be 0 or 1, compare byte by byte once spaces are removed
+        flags = resp.replace(b' ', b'')
+        assert len(flags) == 11 and not flags.translate(None, b'01'), f'get_chassis_status: {resp}'
+        return ChassisStatus(*[flag == 0x31 for flag in flags])  # '1'
 
     def chassis_push_on(self, position_freq: int = None, attitude_freq: int = None, status_freq: int = None, all_freq: int = None) -> str:
         """
@@ -405,24 +793,36 @@ class Commander:
         :param status_freq: 状态推送频率，不设定则设为None.   status push frequency, None for no-op.
         :param all_freq: 统一设置所有推送频率，设置则开启所有推送。   update all push frequency, this affects all attribution.
         :return: ok，否则raise。 ok, or raise certain exception.
+
+        无论设置几项，都只会发出一条命令。三项频率相同时会合并为 ``all_freq``.
+        如需同时开启云台推送，可使用 ``do_many()`` 在一次往返中完成。
+
+        Only one command is sent no matter how many attributions are set.
+        Three equal frequencies are merged into ``all_freq``.
+        To enable gimbal push at the same time in one round trip, use ``do_many()``::
+
+            cmd.do_many([
+                ('chassis', 'push', 'freq', 10),
+                ('gimbal', 'push', 'attitude', 'on', 'afreq', 10),
+            ])
         """
-        valid_frequencies = (1, 5, 10, 20, 30, 50)
-        cmd = ['chassis', 'push']
+        if all_freq is None and position_freq is not None and position_freq == attitude_freq == status_freq:
+            all_freq = position_freq
         if all_freq is not None:
-            assert all_freq in valid_frequencies, f'all_freq {all_freq} is not valid'
-            cmd += ['freq', all_freq]
+            if all_freq not in _VALID_FREQS:
+                raise ValueError(f'all_freq {all_freq} is not valid')
+            cmd = _CHASSIS_PUSH_ALL_TPL % _encode_arg(all_freq)
         else:
-            if position_freq is not None:
-                assert position_freq in valid_frequencies, f'position_freq {position_freq} is not valid'
-                cmd += ['position', SWITCH_ON, 'pfreq', position_freq]
-            if attitude_freq is not None:
-                assert attitude_freq in valid_frequencies, f'attitude_freq {attitude_freq} is not valid'
-                cmd += ['attitude', SWITCH_ON, 'afreq', attitude_freq]
-            if status_freq is not None:
-                assert status_freq in valid_frequencies, f'status_freq {status_freq} is not valid'
-                cmd += ['status', SWITCH_ON, 'sfreq', status_freq]
-        assert len(cmd) > 2, 'at least one argument should not be None'
-        resp = self.do(*cmd)
+            freqs = tuple(freq for freq in (position_freq, attitude_freq, status_freq) if freq is not None)
+            if not freqs:
+                raise ValueError('at least one argument should not be None')
+            if not all(freq in _VALID_FREQS for freq in freqs):
+                raise ValueError(f'invalid frequency: position_freq {position_freq}, '
+                                 f'attitude_freq {attitude_freq}, status_freq {status_freq}')
+            mask = (position_freq is not None) | (attitude_freq is not None) << 1 | (status_freq is not None) << 2
+            cmd = _CHASSIS_PUSH_ON_TPLS[mask] % tuple(_encode_arg(freq) for freq in freqs)
+        with self._mu:
+            resp = self._do_raw(cmd)
         assert self._is_ok(resp), f'chassis_push_on: {resp}'
         return resp
 
@@ -438,16 +838,11 @@ class Commander:
         :param all: 关闭所有推送。   whether disable all pushes.
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        cmd = ['chassis', 'push']
-        if all or position:
-            cmd += ['position', SWITCH_OFF]
-        if all or attitude:
-            cmd += ['attitude', SWITCH_OFF]
-        if all or status:
-            cmd += ['status', SWITCH_OFF]
-
-        assert len(cmd) > 2, 'at least one argument should be True'
-        resp = self.do(*cmd)
+        mask = 0b111 if all else bool(position) | bool(attitude) << 1 | bool(status) << 2
+        if mask <= 0:
+            raise ValueError('at least one argument should be True')
+        with self._mu:
+            resp = self._do_raw(_CHASSIS_PUSH_OFF_CMDS[mask])
         assert self._is_ok(resp), f'chassis_push_off: {resp}'
         return resp
 
@@ -461,9 +856,10 @@ class Commander:
         :param yaw: yaw 轴速度，单位 °/s   yaw speed in °/s
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert -450 <= pitch <= 450, f'pitch {pitch} is out of range'
-        assert -450 <= yaw <= 450, f'yaw {yaw} is out of range'
-        resp = self.do('gimbal', 'speed', 'p', pitch, 'y', yaw)
+        if not (-450 <= pitch <= 450 and -450 <= yaw <= 450):
+            raise ValueError(f'out of range: pitch {pitch}, yaw {yaw}')
+        with self._mu:
+            resp = self._do_raw(_GIMBAL_SPEED_TPL % (_encode_arg(pitch), _encode_arg(yaw)))
         assert self._is_ok(resp), f'gimbal_speed: {resp}'
         return resp
 
@@ -479,10 +875,10 @@ class Commander:
         :param yaw_speed: yaw 轴运动速速，单位 °/s   yaw speed in °/s
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert -55 <= pitch <= 55, f'pitch {pitch} is out of range'
-        assert -55 <= yaw <= 55, f'yaw {yaw} is out of range'
-        assert pitch_speed is None or 0 < pitch_speed <= 540, f'pitch_speed {pitch_speed} is out of range'
-        assert yaw_speed is None or 0 < yaw_speed <= 540, f'yaw_speed {yaw_speed} is out of range'
+        if not (-55 <= pitch <= 55 and -55 <= yaw <= 55):
+            raise ValueError(f'out of range: pitch {pitch}, yaw {yaw}')
+        if not ((pitch_speed is None or 0 < pitch_speed <= 540) and (yaw_speed is None or 0 < yaw_speed <= 540)):
+            raise ValueError(f'out of range: pitch_speed {pitch_speed}, yaw_speed {yaw_speed}')
         cmd = ['gimbal', 'move', 'p', pitch, 'y', yaw]
         if pitch_speed is not None:
             cmd += ['vp', pitch_speed]
@@ -504,10 +900,10 @@ class Commander:
         :param yaw_speed: yaw 轴运动速速，单位 °/s   yaw speed in °/s
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert -25 <= pitch <= 30, f'pitch {pitch} is out of range'
-        assert -250 <= yaw <= 250, f'yaw {yaw} is out of range'
-        assert pitch_speed is None or 0 < pitch_speed <= 540, f'pitch_speed {pitch_speed} is out of range'
-        assert yaw_speed is None or 0 < yaw_speed <= 540, f'yaw_speed {yaw_speed} is out of range'
+        if not (-25 <= pitch <= 30 and -250 <= yaw <= 250):
+            raise ValueError(f'out of range: pitch {pitch}, yaw {yaw}')
+        if not ((pitch_speed is None or 0 < pitch_speed <= 540) and (yaw_speed is None or 0 < yaw_speed <= 540)):
+            raise ValueError(f'out of range: pitch_speed {pitch_speed}, yaw_speed {yaw_speed}')
         cmd = ['gimbal', 'moveto', 'p', pitch, 'y', yaw]
         if pitch_speed is not None:
             cmd += ['vp', pitch_speed]
@@ -561,10 +957,11 @@ class Commander:
 
         :return: pitch 轴角度(°)，yaw 轴角度(°)   pitch, yaw in degree
         """
-        resp = self.do('gimbal', 'attitude', '?')
-        ans = resp.split(' ')
+        with self._mu:
+            resp = self._do_raw(_GIMBAL_ATTITUDE_QUERY, True)
+        ans = resp.split(b' ')
         assert len(ans) == 2, f'get_gimbal_attitude: {resp}'
-        return GimbalAttitude(pitch=float(ans[0]), yaw=float(ans[1]))
+        return GimbalAttitude(*map(float, ans))
 
     def gimbal_push_on(self, attitude_freq: int = 5) -> str:
         """
@@ -575,8 +972,8 @@ class Commander:
         :param attitude_freq: 姿态推送频率.  attitude push frequency.
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        valid_frequencies = (1, 5, 10, 20, 30, 50)
-        assert attitude_freq in valid_frequencies, f'invalid attitude_freq {attitude_freq}'
+        if attitude_freq not in _VALID_FREQS:
+            raise ValueError(f'invalid attitude_freq {attitude_freq}')
         resp = self.do('gimbal', 'push', 'attitude', SWITCH_ON, 'afreq', attitude_freq)
         assert self._is_ok(resp), f'gimbal_push_on: {resp}'
         return resp
@@ -590,8 +987,10 @@ class Commander:
         :param attitude: 关闭姿态推送。   whether disable attitude push.
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert attitude, 'at least one augment should be True'
-        resp = self.do('gimbal', 'push', 'attitude', SWITCH_OFF)
+        if not attitude:
+            raise ValueError('at least one augment should be True')
+        with self._mu:
+            resp = self._do_raw(_GIMBAL_PUSH_OFF_CMD)
         assert self._is_ok(resp), f'gimbal_push_off: {resp}'
         return resp
 
@@ -605,7 +1004,8 @@ class Commander:
             armor sensitivity, the bigger, the more sensitive. Default to 5.
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert 1 <= value <= 10, f'value {value} is out of range'
+        if not (1 <= value <= 10):
+            raise ValueError(f'value {value} is out of range')
         resp = self.do('armor', 'sensitivity', value)
         assert self._is_ok(resp), f'armor_sensitivity: {resp}'
         return resp
@@ -631,8 +1031,10 @@ class Commander:
         :param switch: 是否开启上报   on/off
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert attr in ARMOR_ENUMS, f'unexpected armor event attr {attr}'
-        resp = self.do('armor', 'event', attr, SWITCH_ON if switch else SWITCH_OFF)
+        if attr not in _ARMOR_SET:
+            raise ValueError(f'unexpected armor event attr {attr}')
+        with self._mu:
+            resp = self._do_raw(_ARMOR_EVENT_CMDS[attr][bool(switch)])
         assert self._is_ok(resp), f'armor_event: {resp}'
         return resp
 
@@ -646,8 +1048,10 @@ class Commander:
         :param switch: 是否开启上报   on/off
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert attr in SOUND_ENUMS, f'unexpected armor event attr {attr}'
-        resp = self.do('sound', 'event', attr, SWITCH_ON if switch else SWITCH_OFF)
+        if attr not in _SOUND_SET:
+            raise ValueError(f'unexpected armor event attr {attr}')
+        with self._mu:
+            resp = self._do_raw(_SOUND_EVENT_CMDS[attr][bool(switch)])
         assert self._is_ok(resp), f'armor_event: {resp}'
         return resp
 
@@ -664,14 +1068,17 @@ class Commander:
         :param b: RGB 蓝色分量值   RGB blue value
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        assert comp in LED_ENUMS, f'unknown comp {comp}'
-        assert effect in LED_EFFECT_ENUMS, f'unknown effect {effect}'
-        assert 0 <= r <= 255, f'r {r} is out of scope'
-        assert 0 <= g <= 255, f'g {g} is out of scope'
-        assert 0 <= b <= 255, f'b {b} is out of scope'
+        if comp not in _LED_SET:
+            raise ValueError(f'unknown comp {comp}')
+        if effect not in _LED_EFFECT_SET:
+            raise ValueError(f'unknown effect {effect}')
+        if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+            raise ValueError(f'out of scope: r {r}, g {g}, b {b}')
         if effect == LED_EFFECT_SCROLLING:
-            assert comp in (LED_TOP_ALL, LED_TOP_LEFT, LED_TOP_RIGHT), 'scrolling effect works only on gimbal LEDs'
-        resp = self.do('led', 'control', 'comp', comp, 'r', r, 'g', g, 'b', b, 'effect', effect)
+            if comp not in _LED_GIMBAL_SET:
+                raise ValueError('scrolling effect works only on gimbal LEDs')
+        with self._mu:
+            resp = self._do_raw(_LED_CONTROL_TPL % (_ENUM_BYTES[comp], _encode_arg(r), _encode_arg(g), _encode_arg(b), _ENUM_BYTES[effect]))
         assert self._is_ok(resp), f'led_control: {resp}'
         return resp
 
@@ -684,7 +1091,8 @@ class Commander:
         :param switch: 打开/关闭   on/off
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        resp = self.do('ir_distance_sensor', 'measure', SWITCH_ON if switch else SWITCH_OFF)
+        with self._mu:
+            resp = self._do_raw(_IR_SENSOR_MEASURE_CMDS[bool(switch)])
         assert self._is_ok(resp), f'ir_sensor_measure: {resp}'
         return resp
 
@@ -697,7 +1105,8 @@ class Commander:
         :param id: 红外传感器的 ID   ID of IR sensor
         :return: 指定 ID 的红外传感器测得的距离值，单位 mm   distance in mm
         """
-        assert 1 <= id <= 4, f'invalid IR sensor id {id}'
+        if not (1 <= id <= 4):
+            raise ValueError(f'invalid IR sensor id {id}')
         resp = self.do('ir_distance_sensor', 'distance', id, '?')
         return float(resp)
 
@@ -710,7 +1119,8 @@ class Commander:
         :param switch: 打开/关闭   on/off
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        resp = self.do('stream', SWITCH_ON if switch else SWITCH_OFF)
+        with self._mu:
+            resp = self._do_raw(_STREAM_CMDS[bool(switch)])
         assert self._is_ok(resp), f'stream: {resp}'
         return resp
 
@@ -723,7 +1133,8 @@ class Commander:
         :param switch: 打开/关闭   on/off
         :return: ok，否则raise。 ok, or raise certain exception.
         """
-        resp = self.do('audio', SWITCH_ON if switch else SWITCH_OFF)
+        with self._mu:
+            resp = self._do_raw(_AUDIO_CMDS[bool(switch)])
         assert self._is_ok(resp), f'audio: {resp}'
         return resp
 
@@ -738,3 +1149,273 @@ class Commander:
         resp = self.do('blaster', 'fire')
         assert self._is_ok(resp), f'blaster_fire: {resp}'
         return resp
+
+
+class AsyncCommander:
+    """
+    基于asyncio的Commander，可以在事件循环中与其他协程并发使用。
+    命令内容与 ``Commander.do()`` 相同。
+
+    asyncio flavored Commander, which runs concurrently with other coroutines in the event loop.
+    Commands take the same form as ``Commander.do()``.
+
+    命令是流水线化的：并发调用各自立即发出命令，不必等待前一条的返回，
+    由一个后台读取任务按先进先出的顺序把返回分派给各调用方。
+
+    Commands are pipelined: concurrent callers send their commands right away
+    without waiting for earlier responses, and a single background reader task
+    hands responses back to callers in FIFO order.
+
+    Usage::
+
+        async with AsyncCommander(ip) as cmd:
+            await cmd.do('chassis', 'speed', 'x', 0.5, 'y', 0, 'z', 0)
+    """
+
+    def __init__(self, ip: str = '', timeout: float = 30):
+        """
+        创建实例，实例在 ``connect()`` 之后可用。
+
+        Create a new instance, which is available after ``connect()``.
+
+        :param ip: 可选，机甲IP，可在路由器模式下自动获取。 (Optional) IP of Robomaster, which can be detected automatically under router mode.
+        :param timeout: 可选，TCP通讯超时（秒）。 (Optional) TCP timeout in second.
+        """
+        self._ip: str = ip
+        self._timeout: float = timeout
+        self._closed: bool = True
+        self._mu: Optional[asyncio.Lock] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Future] = None
+        # 等待返回的调用，与已发出的命令一一对应
+        # callers awaiting responses, one per command in flight
+        self._pending: collections.deque = collections.deque()
+
+    async def connect(self) -> 'AsyncCommander':
+        """
+        连接机甲并进入SDK模式。
+
+        Connect to Robomaster and enter SDK mode.
+
+        :return: 实例自身。 the instance itself.
+        """
+        if self._ip == '':
+            loop = asyncio.get_event_loop()
+            self._ip = await loop.run_in_executor(None, get_broadcast_ip, self._timeout)
+        self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self._ip, CTRL_PORT), self._timeout)
+        conn = self._writer.get_extra_info('socket')
+        if conn is not None:
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # asyncio.Lock在3.10之前会绑定创建时的事件循环
+        # asyncio.Lock binds to the event loop at creation before Python 3.10
+        self._mu = asyncio.Lock()
+        self._closed = False
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+        try:
+            resp = await self.do('command')
+            assert Commander._is_ok(resp) or resp == 'Already in SDK mode', f'entering SDK mode: {resp}'
+        except BaseException:
+            # 握手失败时停止读协程并关闭连接，不泄漏给调用者
+            # stop the reader task and close the connection when handshake fails, instead of leaking them
+            await self.close()
+            raise
+        return self
+
+    async def close(self):
+        """
+        关闭实例，回收socket资源。
+
+        Close instance, deallocate system socket resource.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._reader_task.cancel()
+        await asyncio.gather(self._reader_task, return_exceptions=True)
+        self._writer.close()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def get_ip(self) -> str:
+        """
+        返回机甲IP。
+
+        get IP that the commander currently connects to.
+
+        :return: 机甲IP。 IP that the commander currently connects to
+        """
+        return self._ip
+
+    async def _read_loop(self):
+        # 唯一的读取方，按顺序把返回交给等待中的调用。
+        # 超时放弃的调用仍然占据自己的位置，其返回会被丢弃，后续返回不会错位。
+        # the only reader, which hands responses to awaiting callers in order.
+        # A caller that gave up on timeout still holds its slot, so its response
+        # is dropped instead of shifting later responses.
+        pending = self._pending
+        try:
+            while True:
+                try:
+                    frame = await self._reader.readuntil(b';')
+                except asyncio.IncompleteReadError:
+                    raise ConnectionError('connection closed by Robomaster')
+                resp = frame.decode().strip(' ;')
+                if not pending:
+                    _LOGGER.warning('AsyncCommander: unexpected response %s', resp)
+                    continue
+                future = pending.popleft()
+                if not future.done():
+                    future.set_result(resp)
+        except asyncio.CancelledError:
+            err = ConnectionError('connection is already closed')
+            raise
+        except Exception as e:
+            err = e
+        finally:
+            while pending:
+                future = pending.popleft()
+                if not future.done():
+                    future.set_exception(err)
+
+    async def _do_many(self, cmds) -> List[str]:
+        assert len(cmds) > 0, 'empty command list not accepted'
+        assert all(len(args) > 0 for args in cmds), 'empty arg not accepted'
+        assert not self._closed, 'connection is already closed'
+        assert not self._reader_task.done(), 'connection is broken'
+        loop = asyncio.get_event_loop()
+        futures = [loop.create_future() for _ in cmds]
+        # 登记与写入之间没有await，并发调用的顺序与写入顺序一致
+        # no await between registering and writing, so callers line up in write order
+        self._pending.extend(futures)
+        self._writer.writelines([Commander._encode(args) for args in cmds])
+        # 3.10之前并发drain()不安全
+        # concurrent drain() is unsafe before Python 3.10
+        async with self._mu:
+            await self._writer.drain()
+        return await asyncio.wait_for(asyncio.gather(*futures), self._timeout)
+
+    async def do(self, *args) -> str:
+        """
+        执行任意命令。
+
+        Execute any command.
+
+        :param args: 命令内容。 command content.
+        :return: 命令返回。 the response of the command.
+        """
+        resp = await self._do_many((args,))
+        return resp[0]
+
+    async def do_many(self, cmds: Sequence[Sequence]) -> List[str]:
+        """
+        批量执行多条命令，所有命令一次性发出，然后依次读取各自的返回。
+
+        Execute a batch of commands. All commands are sent at once, then their responses are read in order.
+
+        :param cmds: 命令列表，每条命令是一个参数元组。 list of commands, each command is a tuple of arguments.
+        :return: 与命令一一对应的返回列表。 responses in the same order as commands.
+        """
+        return await self._do_many(cmds)
+
+
+class AsyncCommanderPool:
+    """
+    同时控制多台机甲，同一条命令并发发往所有机甲，总耗时约为最慢的一次往返，而不是逐台往返之和。
+
+    Control multiple Robomasters at once. A command is sent to all robots concurrently,
+    so it takes about the slowest round trip rather than the sum of all round trips.
+
+    Usage::
+
+        async with AsyncCommanderPool([ip1, ip2]) as pool:
+            await pool.broadcast('chassis', 'speed', 'x', 0.5, 'y', 0, 'z', 0)
+            await pool[0].do('blaster', 'fire')
+    """
+
+    def __init__(self, ips: Sequence[str], timeout: float = 30):
+        """
+        创建实例，实例在 ``connect()`` 之后可用。
+
+        Create a new instance, which is available after ``connect()``.
+
+        :param ips: 各机甲IP。 IPs of Robomasters.
+        :param timeout: 可选，TCP通讯超时（秒）。 (Optional) TCP timeout in second.
+        """
+        if not ips:
+            raise ValueError('at least one IP is needed')
+        self._commanders: List[AsyncCommander] = [AsyncCommander(ip, timeout) for ip in ips]
+
+    async def connect(self) -> 'AsyncCommanderPool':
+        """
+        并发连接所有机甲，任何一台连接失败时关闭全部连接并raise。
+
+        Connect to all Robomasters concurrently.
+        If any of them fails, all connections are closed and the error is raised.
+
+        :return: 实例自身。 the instance itself.
+        """
+        results = await asyncio.gather(*(c.connect() for c in self._commanders), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                await self.close()
+                raise result
+        return self
+
+    async def close(self):
+        """
+        关闭所有连接。
+
+        Close all connections.
+        """
+        await asyncio.gather(*(c.close() for c in self._commanders))
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __len__(self) -> int:
+        return len(self._commanders)
+
+    def __getitem__(self, index: int) -> AsyncCommander:
+        return self._commanders[index]
+
+    def get_ips(self) -> List[str]:
+        """
+        返回各机甲IP。
+
+        get IPs of Robomasters in the pool.
+
+        :return: 各机甲IP。 IPs of Robomasters.
+        """
+        return [c.get_ip() for c in self._commanders]
+
+    async def broadcast(self, *args) -> List[str]:
+        """
+        向所有机甲并发发送同一条命令。
+
+        Send the same command to all Robomasters concurrently.
+
+        :param args: 命令内容。 command content.
+        :return: 按机甲顺序排列的返回。 responses in the order of robots.
+        """
+        return await asyncio.gather(*(c.do(*args) for c in self._commanders))
+
+    async def dispatch(self, cmds: Sequence[Sequence]) -> List[str]:
+        """
+        向各机甲并发发送各自的命令，第i条命令发往第i台机甲。
+
+        Send each Robomaster its own command concurrently, the i-th command goes to the i-th robot.
+
+        :param cmds: 命令列表，每条命令是一个参数元组。 list of commands, each command is a tuple of arguments.
+        :return: 按机甲顺序排列的返回。 responses in the order of robots.
+        """
+        if len(cmds) != len(self._commanders):
+            raise ValueError(f'expecting {len(self._commanders)} commands, got {len(cmds)}')
+        return await asyncio.gather(*(c.do(*args) for c, args in zip(self._commanders, cmds)))
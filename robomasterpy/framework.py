@@ -14,12 +14,89 @@ import signal
 import platform
 import socket
 import sys
+import threading
 import time
-from typing import List, Callable, Tuple, Optional, Iterator
+from multiprocessing.connection import wait as _wait_readers
+from multiprocessing.queues import Queue as _MPQueue
+from typing import Any, Dict, List, Callable, Tuple, Optional
 
 import cv2 as cv
 
-from .client import CTX, LOG_LEVEL, PUSH_PORT, GimbalAttitude, ChassisPosition, ChassisAttitude, ChassisStatus, DEFAULT_BUF_SIZE, EVENT_PORT, ARMOR_HIT, ArmorHitEvent, SOUND_APPLAUSE, SoundApplauseEvent, VIDEO_PORT, Commander
+from .client import CTX, LOG_LEVEL, PUSH_PORT, GimbalAttitude, ChassisPosition, ChassisAttitude, ChassisStatus, RECV_BUF_SIZE, EVENT_PORT, ARMOR_HIT, ArmorHitEvent, SOUND_APPLAUSE, SoundApplauseEvent, VIDEO_PORT, Commander
+
+# Windows上没有MSG_DONTWAIT
+# MSG_DONTWAIT is not available on Windows
+_MSG_DONTWAIT: int = getattr(socket, 'MSG_DONTWAIT', 0)
+
+_LOG_FORMATTER = logging.Formatter('%(asctime)s %(name)-12s : %(levelname)-8s %(message)s')
+
+
+# 底盘状态标志位的合法取值
+# valid values of chassis status flags
+_STATUS_FLAGS = frozenset(('0', '1'))
+
+
+def _parse_chassis_status(words: List[str]) -> ChassisStatus:
+    ans = words[-11:]
+    assert len(ans) == 11, f'invalid chassis status payload, words: {words}'
+    # 标志位只能是0或1，其他内容说明负载已损坏
+    # flags must be 0 or 1, anything else means the payload is corrupted
+    assert _STATUS_FLAGS.issuperset(ans), f'invalid chassis status flags, words: {words}'
+    return ChassisStatus(*[x == '1' for x in ans])
+
+
+# 无法等待其底层管道的队列（如manager.Queue()）的轮询间隔，单位为秒
+# polling interval in seconds for queues whose underlying pipe can not be waited on, e.g. manager.Queue()
+_DRAIN_POLL_INTERVAL: float = 0.005
+
+
+def _drain_ready(queues, drained: Dict[Any, List]) -> None:
+    for q in queues:
+        items = []
+        while True:
+            try:
+                items.append(q.get_nowait())
+            except queue.Empty:
+                break
+        if items:
+            drained[q] = items
+
+
+def drain_queues(queues: Tuple[mp.Queue, ...], timeout: Optional[float] = None) -> Dict[Any, List]:
+    """
+    等待任一队列中有数据，然后非阻塞地取出所有就绪队列中的全部数据，适合在 ``Mind`` 的回调函数中使用。
+    若队列均为 ``multiprocessing.Queue`` ，所有队列的等待由一次系统调用完成；
+    否则（如 ``manager.Queue()`` ）退化为轮询。
+
+    Waits until any of the queues has data, then takes all items out of every ready queue without blocking.
+    Suits the callback of ``Mind``.
+    If all queues are ``multiprocessing.Queue``, they are waited on with a single syscall,
+    otherwise (e.g. ``manager.Queue()``) it falls back to polling.
+
+    :param queues: 队列元组   tuple of queues
+    :param timeout: 最长等待时间，单位为秒，None表示一直等待。
+        max time to wait in seconds, None means waiting forever.
+    :return: 以队列为键，取出的数据列表为值的字典，超时或queues为空时为空字典。
+        dict mapping each ready queue to the list of items taken out, empty on timeout or when queues is empty.
+    """
+    drained: Dict[Any, List] = {}
+    # 没有可等待的队列，否则timeout为None时会永远等下去
+    # nothing to wait on, otherwise it would wait forever with timeout None
+    if not queues:
+        return drained
+    readers = [getattr(q, '_reader', None) for q in queues]
+    if None not in readers:
+        by_reader = dict(zip(readers, queues))
+        ready = _wait_readers(readers, timeout)
+        _drain_ready([by_reader[reader] for reader in ready], drained)
+        return drained
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        _drain_ready(queues, drained)
+        if drained or (deadline is not None and time.monotonic() >= deadline):
+            return drained
+        time.sleep(_DRAIN_POLL_INTERVAL)
 
 
 class Worker:
@@ -51,6 +128,12 @@ class Worker:
     """
 
     QUEUE_TIMEOUT: float = 0.05
+    # out满时_outlet()是否直接丢弃新产物，否则等待下游消费
+    # whether _outlet() drops new products at once when out is full, otherwise it waits for downstream
+    DROP_ON_FULL: bool = False
+    # socket的内核接收缓冲区大小，突发的推送在下游处理时不至于被内核丢弃
+    # kernel receive buffer size of socket, so bursts of pushes are not dropped by kernel while being processed
+    RCVBUF_SIZE: int = 262144
 
     def __init__(self, name: str, out: Optional[mp.Queue], protocol: Optional[str], address: Tuple[str, int], timeout: Optional[float], loop: bool = True):
         """
@@ -73,38 +156,100 @@ class Worker:
         assert name is not None and name != '', 'choose a good name to make life easier'
 
         self._mu = CTX.Lock()
-        with self._mu:
-            signal.signal(signal.SIGINT, self._handle_close_signal)
-            signal.signal(signal.SIGTERM, self._handle_close_signal)
-            self._name: str = name
-            self._closed: bool = False
-            self._address: Tuple[str, int] = address
-            self._out: Optional[mp.Queue] = out
-            self._logger: logging.Logger = logging.getLogger(name)
-            self._logger.setLevel(LOG_LEVEL)
+        self._name: str = name
+        self._closed: bool = False
+        self._address: Tuple[str, int] = address
+        self._out: Optional[mp.Queue] = out
+        # DROP_ON_FULL时被丢弃的产物数目
+        # number of products dropped with DROP_ON_FULL
+        self._dropped: int = 0
+        self._owns_out: bool = True
+        # work循环是否正在运行
+        # whether the work loop is running
+        self._running: bool = False
+        self._logger: logging.Logger = logging.getLogger(name)
+        self._logger.setLevel(LOG_LEVEL)
+        # 同名logger只添加一次handler，避免重复输出
+        # add handler once per logger name, otherwise logs are printed repeatedly
+        if not self._logger.handlers:
             handler = logging.StreamHandler(sys.stdout)
-            formatter = logging.Formatter('%(asctime)s %(name)-12s : %(levelname)-8s %(message)s')
-            handler.setFormatter(formatter)
+            handler.setFormatter(_LOG_FORMATTER)
             self._logger.addHandler(handler)
-            self._loop: bool = loop
+            # 已经有自己的handler，不再传递给root logger，避免同一条日志被输出两次
+            # the logger has its own handler, do not pass records on to root logger, otherwise they are printed twice
+            self._logger.propagate = False
+        # 日志级别在运行期间不变，缓存检查结果供热路径使用
+        # log level does not change at runtime, cache the check for hot paths
+        self._debug: bool = self._logger.isEnabledFor(logging.DEBUG)
+        self._loop: bool = loop
+        self._conn: Optional[socket.socket] = None
+
+        # 在耗时的连接之前安装信号处理器，构造期间收到的信号也能让worker关闭。
+        # 信号只会递送到主线程，线程中的worker由Hub负责关闭。
+        # install signal handlers before the slow connecting, so that signals during construction close the worker, too.
+        # signals only reach the main thread, Hub closes workers running in threads.
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self._handle_close_signal)
+            signal.signal(signal.SIGTERM, self._handle_close_signal)
 
+        # Linux上TCP_QUICKACK不是持久的，内核会回到延迟确认，需要在每次recv后重新设置，见 _intake_records()
+        # TCP_QUICKACK is not sticky on Linux, the kernel returns to delayed ACKs, so it is set again after every recv, see _intake_records()
+        self._quickack: bool = protocol == 'tcp' and hasattr(socket, 'TCP_QUICKACK')
+        # 接收缓冲区需要在connect之前设置，才能影响TCP窗口
+        # receive buffer is set before connect so that it affects TCP window
+        try:
             if protocol == 'tcp':
                 self._conn: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self._conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.RCVBUF_SIZE)
+                self._conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if self._quickack:
+                    # Linux only
+                    # 立即确认收到的事件，避免机甲的Nagle算法等待延迟确认
+                    # acknowledge events at once, so Robomaster's Nagle does not wait for our delayed ACK
+                    self._conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
                 self._conn.settimeout(timeout)
                 self._conn.connect(self._address)
             elif protocol == 'udp':
                 self._conn: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.RCVBUF_SIZE)
                 self._conn.settimeout(timeout)
                 self._conn.bind(self._address)
-            elif protocol is None:
-                self._conn: Optional[socket.socket] = None
-                pass
-            else:
+            elif protocol is not None:
                 raise ValueError(f'unknown protocol {protocol}')
+        except OSError:
+            # 构造期间收到的信号已经由close()关闭了socket
+            # a signal during construction has closed the socket through close() already
+            if not self._closed:
+                raise
+
+        if self._conn is not None and self._closed:
+            # 信号可能在socket创建之前到达，此时close()没有关闭它
+            # the signal may arrive before the socket is created, close() missed it then
+            self._conn.close()
+        elif self._conn is not None:
+            # 内核可能按net.core.rmem_max截断请求的大小（Linux报告的值是实际大小的两倍）
+            # kernel may cap the requested size at net.core.rmem_max (Linux reports twice the usable size)
+            if self._debug:
+                self._logger.debug('socket receive buffer requested %d bytes, kernel reports %d bytes',
+                                   self.RCVBUF_SIZE, self._conn.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF))
+            # 预分配的接收缓冲区，供 _intake_records() 和 _intake_datagram() 使用
+            # preallocated receive buffer for _intake_records() and _intake_datagram()
+            self._rx: bytearray = bytearray(RECV_BUF_SIZE)
+            self._rx_view: memoryview = memoryview(self._rx)
+            self._rx_len: int = 0
 
     def _handle_close_signal(self, sig, stacks):
         self.close()
 
+    @property
+    def dropped(self) -> int:
+        """
+        ``DROP_ON_FULL`` 为True时，因out已满被丢弃的产物数目。
+
+        Number of products dropped because ``out`` was full, when ``DROP_ON_FULL`` is True.
+        """
+        return self._dropped
+
     @property
     def closed(self) -> bool:
         """
@@ -129,9 +274,25 @@ class Worker:
             self._closed = True
             self.logger.info('signal received, closing...')
             if self._conn is not None:
+                # 唤醒阻塞在recv上的线程，单独close()在Linux上做不到
+                # wake up threads blocking on recv, close() alone does not do it on Linux
+                try:
+                    self._conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
                 self._conn.close()
-            if self._out is not None and type(self._out) == mp.Queue:
-                self._out.close()
+            # close()可能在信号处理器中打断_outlet()，此时由__call__()在循环退出后关闭out
+            # close() may interrupt _outlet() from the signal handler, __call__() closes out after the loop exits then
+            if not self._running:
+                self._close_out()
+
+    def _close_out(self):
+        # mp.Queue是工厂函数，需要与其返回的类比较；manager.Queue()和queue.Queue没有close()。
+        # 线程中的worker与其他线程共用同一个队列对象，不能关闭它。
+        # mp.Queue is a factory, compare with the class it returns; manager.Queue() and queue.Queue have no close().
+        # workers in threads share the very queue object with other threads, it must not be closed.
+        if self._owns_out and isinstance(self._out, _MPQueue):
+            self._out.close()
 
     @property
     def name(self) -> str:
@@ -146,16 +307,20 @@ class Worker:
         """
         在本方法中实现你的业务逻辑，你可能需要在这里使用下列方法和属性：
 
-        * 使用 ``self._intake()`` 方法从tcp或udp中获取数据；
-        * 使用 ``self._outlet()`` 方法将产物放到out中，注意，如果out被没有即时消费的产物填满，self._outlet()会丢弃最新的产物；
+        * 使用 ``self._intake()`` 方法从tcp或udp中获取数据，对于以;结尾的文本协议，
+          可使用 ``self._intake_records()`` （tcp）或 ``self._intake_datagram()`` （udp）；
+        * 使用 ``self._outlet()`` 方法将产物放到out中，注意，如果out被没有即时消费的产物填满，
+          self._outlet()会等待下游消费，如果 ``DROP_ON_FULL`` 为True，则直接丢弃最新的产物；
         * 使用 ``self.logger`` 属性打印日志。
 
         预置worker不需要自己实现本方法。
 
         Implement your business logic in this method. These methods and attributes may be useful:
 
-        * use ``self._intake()`` method to intake data from tcp or udp connection;
-        * use ``self._outlet()`` to put product to ``out``. Keep in mind if ``out`` is filled up with unconsumed product, self._outlet() discards the latest products.
+        * use ``self._intake()`` method to intake data from tcp or udp connection.
+          For ;-terminated text protocols, ``self._intake_records()`` (tcp) or ``self._intake_datagram()`` (udp) are handy;
+        * use ``self._outlet()`` to put product to ``out``. Keep in mind if ``out`` is filled up with unconsumed product,
+          self._outlet() waits for downstream, or discards the latest products at once if ``DROP_ON_FULL`` is True.
         * use ``self.logger`` for log printing.
 
         There's no need to implement this method in Sugared Workers.
@@ -163,24 +328,34 @@ class Worker:
         raise NotImplementedError('implement me')
 
     def __call__(self) -> None:
+        self._running = True
         try:
             if self._loop:
-                while not self.closed:
-                    self.work()
+                # 循环中直接读属性，并缓存绑定方法
+                # read the attribute directly and cache the bound method in the loop
+                work = self.work
+                while not self._closed:
+                    work()
             else:
                 self.work()
         except EOFError:
             if not self.closed:
                 raise
         finally:
+            self._running = False
             self.close()
+            self._close_out()
 
     @property
     def logger(self) -> logging.Logger:
         """
         使用本属性打印日志。
+        在高频调用处，请使用 ``logger.debug('parsed %s', payload)`` 形式延迟格式化，
+        或先以 ``logger.isEnabledFor(logging.DEBUG)`` 判断，避免为不输出的日志构造参数。
 
         Use this attribute for logging.
+        On hot paths, prefer lazy formatting like ``logger.debug('parsed %s', payload)``,
+        or check ``logger.isEnabledFor(logging.DEBUG)`` first, so that no arguments are built for disabled logs.
         """
         return self._logger
 
@@ -191,9 +366,76 @@ class Worker:
         self._assert_ready()
         return self._conn.recv(buf_size)
 
+    def _intake_records(self) -> str:
+        # 从tcp流中读取，返回所有完整的以;结尾的记录，不完整的尾部留在缓冲区中等下次读取
+        # read from tcp stream and return all complete ;-terminated records,
+        # an incomplete tail stays in buffer for the next read
+        assert not self._closed, 'Worker is already closed'
+        rx, view = self._rx, self._rx_view
+        end = rx.rfind(b';', 0, self._rx_len)
+        while end < 0:
+            if self._rx_len >= len(rx):
+                # 运行期的I/O状况，不能用assert，否则-O下会被误报为连接关闭
+                # a runtime I/O condition, not an assert, otherwise -O reports it as a closed connection
+                raise ConnectionError('record exceeds receive buffer')
+            n = self._conn.recv_into(view[self._rx_len:])
+            if n == 0:
+                raise EOFError('connection closed by Robomaster')
+            if self._quickack:
+                self._conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            end = rx.rfind(b';', self._rx_len, self._rx_len + n)
+            self._rx_len += n
+        end += 1
+        msg = str(view[:end], 'utf-8')
+        remaining = self._rx_len - end
+        rx[:remaining] = rx[end:self._rx_len]
+        self._rx_len = remaining
+        return msg
+
+    def _intake_datagram(self) -> str:
+        # 读取一个udp数据报，直接从缓冲区解码
+        # read one udp datagram, decoded straight from buffer
+        assert not self._closed, 'Worker is already closed'
+        n = self._conn.recv_into(self._rx_view)
+        return str(self._rx_view[:n], 'utf-8')
+
+    def _intake_datagrams(self, limit: int = 64) -> List[str]:
+        # 阻塞读取一个udp数据报，然后非阻塞地取走已经到达的数据报，一次唤醒处理一批。
+        # 仅适用于没有设置超时的socket，设置超时后recv会在内部等待。
+        # read one udp datagram blocking, then take those already arrived without blocking,
+        # handling a batch per wakeup.
+        # Only for sockets without timeout, otherwise recv waits internally.
+        msgs = [self._intake_datagram()]
+        if _MSG_DONTWAIT:
+            recv_into, view = self._conn.recv_into, self._rx_view
+            while len(msgs) < limit:
+                try:
+                    n = recv_into(view, 0, _MSG_DONTWAIT)
+                except BlockingIOError:
+                    break
+                msgs.append(str(view[:n], 'utf-8'))
+        return msgs
+
     def _outlet(self, payload):
-        self._assert_ready()
-        while not self.closed:
+        # 每条产物都会经过这里，直接读属性，省去方法和property调用
+        # every product goes through here, read the attribute directly without method and property calls
+        assert not self._closed, 'Worker is already closed'
+        if self.DROP_ON_FULL:
+            try:
+                self._out.put_nowait(payload)
+            except queue.Full:
+                self._dropped += 1
+                if self._debug:
+                    self._logger.debug('out is full, product dropped, %d dropped so far', self._dropped)
+            return
+        # 队列未满时不进入带超时的阻塞put
+        # skip the blocking put with timeout while the queue has room
+        try:
+            self._out.put_nowait(payload)
+            return
+        except queue.Full:
+            pass
+        while not self._closed:
             try:
                 self._out.put(payload, block=True, timeout=self.QUEUE_TIMEOUT)
             except queue.Full:
@@ -213,7 +455,7 @@ class Worker:
     def __enter__(self):
         return self
 
-    def __exit__(self):
+    def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
 
@@ -233,18 +475,42 @@ class Hub:
     """
 
     TERMINATION_TIMEOUT = 10
+    # terminate()之后等待进程退出的时间，超时则kill()
+    # time to wait for processes to exit after terminate(), kill() them afterwards
+    KILL_TIMEOUT = 1
 
-    def __init__(self):
+    def __init__(self, start_method: Optional[str] = None):
         """
-        创建Hub不需要提供参数。
+        初始化自身。
 
-        Hub does not need parameters to initialize.
+        Initialize self.
+
+        :param start_method: 进程worker的启动方式，默认为spawn.
+            在Linux上使用fork可以让worker共享父进程已经加载的OpenCV和模型，显著加快启动，节约内存；
+            使用fork时，父进程在注册worker之前不应使用CUDA等fork不安全的库。
+            当前平台不支持时回落到spawn.
+            start method of process workers, defaults to spawn.
+            On Linux, fork lets workers share OpenCV and models already loaded by the parent,
+            which starts much faster and saves memory.
+            When using fork, the parent should not call fork-unsafe libraries like CUDA before workers start.
+            Falls back to spawn if the platform does not support it.
         """
+        if start_method is None:
+            self._ctx = CTX
+        elif start_method in mp.get_all_start_methods():
+            self._ctx = mp.get_context(start_method)
+        else:
+            logging.warning('start method "%s" is not supported on this platform, using spawn', start_method)
+            self._ctx = CTX
+        # 构造期间其他线程无法访问self，无需持锁
+        # no other thread can reach self during construction, no need to hold the lock
         self._mu = CTX.Lock()
         self._block = True
-        with self._mu:
-            self._closed: bool = False
-            self._workers: List = []
+        self._closed: bool = False
+        self._workers: List = []
+        # 以线程方式运行的worker实例，关闭时需要由Hub通知
+        # worker instances running as threads, which Hub has to close itself
+        self._thread_workers: List[Worker] = []
 
     def close(self):
         """
@@ -256,14 +522,33 @@ class Hub:
             if self._closed:
                 return
             self._closed = True
+            thread_workers = list(self._thread_workers)
 
-            end_time = time.time() + self.TERMINATION_TIMEOUT
-            for worker in self._workers:
-                remain_time = max(0.0, end_time - time.time())
-                worker.join(remain_time)
-            for worker in self._workers:
-                if worker.is_alive():
-                    worker.terminate()
+        for worker in thread_workers:
+            worker.close()
+        # 所有worker共享同一个截止时间，总耗时与worker数量无关
+        # all workers share one deadline, so shutdown time does not grow with the number of workers
+        deadline = time.monotonic() + self.TERMINATION_TIMEOUT
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+
+        stuck = [worker for worker in self._workers if worker.is_alive()]
+        for worker in stuck:
+            logging.warning('worker "%s" did not exit in %s seconds, terminating', worker.name, self.TERMINATION_TIMEOUT)
+            # 线程无法被强制结束，它们是守护线程，随主进程退出
+            # threads can not be terminated, they are daemons and exit along with the main process
+            if hasattr(worker, 'terminate'):
+                worker.terminate()
+        deadline = time.monotonic() + self.KILL_TIMEOUT
+        for worker in stuck:
+            if not hasattr(worker, 'terminate'):
+                continue
+            worker.join(max(0.0, deadline - time.monotonic()))
+            # Python 3.7之前没有kill()
+            # kill() is not available before Python 3.7
+            if worker.is_alive() and hasattr(worker, 'kill'):
+                logging.warning('worker "%s" ignored SIGTERM, killing', worker.name)
+                worker.kill()
 
     def _assert_ready(self):
         assert not self._closed, 'Hub is closed'
@@ -271,16 +556,16 @@ class Hub:
     def __enter__(self):
         return self
 
-    def __exit__(self):
+    def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def worker(self, worker_class, name: str, args: Tuple = (), kwargs=None):
+    def worker(self, worker_class, name: str, args: Tuple = (), kwargs=None, backend: str = 'process'):
         """
         将worker注册到hub.
-        所有的worker都在独立的进程中运行。
+        默认情况下，worker在独立的进程中运行。
 
         Register worker to hub.
-        All workers run in their own operating system process.
+        By default, workers run in their own operating system process.
 
         :param worker_class: worker的类，注意不是worker实例。
             class of worker to be registered, note provide the class, instead of an instance.
@@ -290,16 +575,45 @@ class Hub:
             args to initialize the worker.
         :param kwargs: 创建worker需要使用的kwargs参数。
             kwargs to initialize the worker.
+        :param backend: worker的运行方式，process（默认）在独立进程中运行；
+            thread在Hub所在进程的线程中运行，启动更快，可以使用 ``queue.Queue`` 通讯，适合I/O密集的worker，如PushListener，EventListener和Mind.
+            CPU密集的worker，如Vision，应使用process.
+            how the worker runs. process (default) runs it in its own process;
+            thread runs it in a thread of hub's process, which starts faster and can communicate through ``queue.Queue``,
+            suiting I/O bound workers like PushListener, EventListener and Mind.
+            CPU bound workers like Vision should use process.
         """
         if kwargs is None:
             kwargs = {}
-        process = CTX.Process(name=name, target=self._build_worker_and_run, args=(worker_class, name, *args), kwargs=kwargs)
-        self._workers.append(process)
+        if backend == 'process':
+            worker = self._ctx.Process(name=name, target=self._build_worker_and_run, args=(worker_class, name, *args), kwargs=kwargs)
+        elif backend == 'thread':
+            worker = threading.Thread(name=name, target=self._build_worker_and_run_in_thread, args=(worker_class, name, *args), kwargs=kwargs, daemon=True)
+        else:
+            raise ValueError(f'unknown backend {backend}')
+        self._workers.append(worker)
 
     @staticmethod
     def _build_worker_and_run(*args, **kwargs):
+        worker_class = args[0]
+        # 信号处理器由Worker.__init__()在连接之前安装
+        # signal handlers are installed by Worker.__init__() before connecting
+        worker = worker_class(*args[1:], **kwargs)
+        worker()
+
+    def _build_worker_and_run_in_thread(self, *args, **kwargs):
+        # 信号只会递送到主线程，由Hub负责关闭
+        # signals only reach the main thread, Hub closes the worker instead
         worker_class = args[0]
         worker = worker_class(*args[1:], **kwargs)
+        worker._owns_out = False
+        with self._mu:
+            closed = self._closed
+            if not closed:
+                self._thread_workers.append(worker)
+        if closed:
+            worker.close()
+            return
         worker()
 
     def signal_handler(self, sig, frame):
@@ -347,14 +661,17 @@ class Hub:
 class PushListener(Worker):
     """
     监听并解析机甲大师的推送，输出强类型的推送内容。
+    如果只关心最新的推送，可以继承本类并设置 ``DROP_ON_FULL = True`` ，下游跟不上时丢弃新的推送，丢弃的数目见 ``dropped`` 。
 
     Listen and parse pushes from Robomaster, product parsed pushes in strong typed manner.
+    If only the latest pushes matter, inherit this class and set ``DROP_ON_FULL = True``
+    to drop new pushes when downstream lags behind, see ``dropped`` for how many were dropped.
     """
     PUSH_TYPE_CHASSIS: str = 'chassis'
     PUSH_TYPE_GIMBAL: str = 'gimbal'
     PUSH_TYPES: Tuple[str] = (PUSH_TYPE_CHASSIS, PUSH_TYPE_GIMBAL)
 
-    def __init__(self, name: str, out: mp.Queue):
+    def __init__(self, name: str, out: mp.Queue, batch: bool = False):
         """
         初始化自身。
 
@@ -363,79 +680,107 @@ class PushListener(Worker):
         :param name: worker名称   name of worker
         :param out: PushListener会将产物放入其中以供下游消费。
             PushListener puts product into ``out`` for downstream consuming.
+        :param batch: 为True时，每次接收到的全部推送以一个列表整体放入 ``out`` ，减少队列操作和序列化的次数，
+            下游需要遍历列表；默认为False，逐条放入。
+            when True, all pushes received at once are put into ``out`` as one list, which saves queue operations and pickling,
+            downstream has to iterate the list. Defaults to False, which puts them one by one.
         """
         super().__init__(name, out, 'udp', ('', PUSH_PORT), None)
+        self._batch: bool = batch
 
     def _parse(self, msg: str) -> List:
-        payloads: Iterator[str] = map(lambda x: x.strip(), msg.strip(' ;').split(';'))
-        current_push_type: Optional[str] = None
-        has_type_prefix: bool = False
+        type_parsers = self._TYPE_PARSERS
+        # 快速路径：大多数数据报只有一条带类型前缀的负载，如云台姿态
+        # fast path: most datagrams carry a single payload with type prefix, e.g. gimbal attitude
+        if msg.count(';') < 2:
+            head, _, rest = msg.partition(';')
+            words = head.split()
+            parser = type_parsers.get(words[0]) if words else None
+            if parser is not None and (not rest or rest.isspace()):
+                return [parser(words, 2)]
+
+        current_parser: Optional[Callable] = None
+        # 带类型前缀的负载中，子类型位于words[2]，否则位于words[0]
+        # subtype is at words[2] in payloads with type prefix, otherwise at words[0]
+        offset: int = 0
         parsed: List = []
-        for index, payload in enumerate(payloads):
-            words = payload.split(' ')
+        for index, payload in enumerate(msg.split(';')):
+            # 无参数的split()会去除首尾空白并合并连续空白
+            # split() without argument trims and collapses whitespace
+            words = payload.split()
+            if not words:
+                continue
             assert len(words) > 1, f'unexpected payload at index {index}, context: {msg}'
-            if words[0] in self.PUSH_TYPES:
-                current_push_type = words[0]
-                has_type_prefix = True
+            parser = type_parsers.get(words[0])
+            if parser is not None:
+                current_parser = parser
+                offset = 2
             else:
-                has_type_prefix = False
-            assert current_push_type is not None, f'can not decide push type of payload at index {index}, context: {msg}'
-
-            if current_push_type == self.PUSH_TYPE_CHASSIS:
-                parsed.append(self._parse_chassis_push(words, has_type_prefix))
-            elif current_push_type == self.PUSH_TYPE_GIMBAL:
-                parsed.append(self._parse_gimbal_push(words, has_type_prefix))
-            else:
-                raise ValueError(f'unknown push type {current_push_type} at index {index}, context: {msg}')
+                offset = 0
+            assert current_parser is not None, f'can not decide push type of payload at index {index}, context: {msg}'
+            parsed.append(current_parser(words, offset))
+        assert parsed, f'empty push, context: {msg}'
         return parsed
 
+    # 按推送子类型分派的解析函数
+    # parsers dispatched by push subtype
+    _GIMBAL_PARSERS = {
+        'attitude': lambda words: GimbalAttitude(float(words[-2]), float(words[-1])),
+    }
+    _CHASSIS_PARSERS = {
+        'position': lambda words: ChassisPosition(float(words[-2]), float(words[-1]), None),
+        'attitude': lambda words: ChassisAttitude(float(words[-3]), float(words[-2]), float(words[-1])),
+        'status': _parse_chassis_status,
+    }
+
     @staticmethod
-    def _parse_gimbal_push(words: List[str], has_type_prefix: bool):
-        subtype: str = ''
-        if has_type_prefix:
-            assert len(words) > 3, f'invalid gimbal push payload, words: {words}'
-            subtype = words[2]
-        else:
-            assert len(words) > 1, f'invalid gimbal push payload, words: {words}'
-            subtype = words[0]
+    def _parse_gimbal_push(words: List[str], offset: int):
+        assert len(words) > offset + 1, f'invalid gimbal push payload, words: {words}'
+        subtype = words[offset]
 
-        if subtype == 'attitude':
-            return GimbalAttitude(float(words[-2]), float(words[-1]))
-        else:
+        parser = PushListener._GIMBAL_PARSERS.get(subtype)
+        if parser is None:
             raise ValueError(f'unknown gimbal push subtype {subtype}, context: {words}')
+        return parser(words)
 
     @staticmethod
-    def _parse_chassis_push(words: List[str], has_type_prefix: bool):
-        subtype: str = ''
-        if has_type_prefix:
-            assert len(words) > 3, f'invalid chassis push payload, words: {words}'
-            subtype = words[2]
-        else:
-            assert len(words) > 1, f'invalid chassis push payload, words: {words}'
-            subtype = words[0]
-
-        if subtype == 'position':
-            return ChassisPosition(float(words[-2]), float(words[-1]), None)
-        elif subtype == 'attitude':
-            return ChassisAttitude(float(words[-3]), float(words[-2]), float(words[-1]))
-        elif subtype == 'status':
-            ans = words[-11:]
-            assert len(ans) == 11, f'invalid chassis status payload, words: {words}'
-            return ChassisStatus(*map(lambda x: bool(int(x)), ans))
-        else:
+    def _parse_chassis_push(words: List[str], offset: int):
+        assert len(words) > offset + 1, f'invalid chassis push payload, words: {words}'
+        subtype = words[offset]
+
+        parser = PushListener._CHASSIS_PARSERS.get(subtype)
+        if parser is None:
             raise ValueError(f'unknown chassis push subtype {subtype}, context: {words}')
+        return parser(words)
+
+    # 按推送类型分派，staticmethod在3.10之前不可直接调用
+    # dispatched by push type, staticmethod objects are not callable before Python 3.10
+    _TYPE_PARSERS = {
+        PUSH_TYPE_CHASSIS: _parse_chassis_push.__func__,
+        PUSH_TYPE_GIMBAL: _parse_gimbal_push.__func__,
+    }
 
     def work(self) -> None:
         try:
-            msg = self._intake(DEFAULT_BUF_SIZE).decode()
+            msgs = self._intake_datagrams()
         except OSError:
             if self.closed:
                 return
             else:
                 raise
-        payloads = self._parse(msg)
-        for payload in payloads:
-            self._outlet(payload)
+        if self.closed:
+            return
+        if self._batch:
+            parsed = []
+            for msg in msgs:
+                parsed.extend(self._parse(msg))
+            if parsed:
+                self._outlet(parsed)
+            return
+        parse, outlet = self._parse, self._outlet
+        for msg in msgs:
+            for payload in parse(msg):
+                outlet(payload)
 
 
 class EventListener(Worker):
@@ -449,7 +794,7 @@ class EventListener(Worker):
     EVENT_TYPE_SOUND: str = 'sound'
     EVENT_TYPES: Tuple[str] = (EVENT_TYPE_ARMOR, EVENT_TYPE_SOUND)
 
-    def __init__(self, name: str, out: mp.Queue, ip: str):
+    def __init__(self, name: str, out: mp.Queue, ip: str, batch: bool = False):
         """
         初始化自身。
 
@@ -460,73 +805,90 @@ class EventListener(Worker):
             PushListener puts product into ``out`` for downstream consuming.
         :param ip: 机甲的IP，可从Commander.get_ip()取得。
             IP of your Robomaster, can be obtained from Commander.get_ip()
+        :param batch: 为True时，每次接收到的全部事件以一个列表整体放入 ``out`` ，减少队列操作和序列化的次数，
+            下游需要遍历列表；默认为False，逐条放入。
+            when True, all events received at once are put into ``out`` as one list, which saves queue operations and pickling,
+            downstream has to iterate the list. Defaults to False, which puts them one by one.
         """
         super().__init__(name, out, 'tcp', (ip, EVENT_PORT), None)
+        self._batch: bool = batch
 
     def _parse(self, msg: str) -> List:
-        payloads: Iterator[str] = map(lambda x: x.strip(), msg.strip(' ;').split(';'))
-        current_event_type: Optional[str] = None
-        has_type_prefix: bool = False
+        type_parsers = self._TYPE_PARSERS
+        current_parser: Optional[Callable] = None
+        # 带类型前缀的负载中，子类型位于words[2]，否则位于words[0]
+        # subtype is at words[2] in payloads with type prefix, otherwise at words[0]
+        offset: int = 0
         parsed: List = []
-        for index, payload in enumerate(payloads):
-            words = payload.split(' ')
+        for index, payload in enumerate(msg.split(';')):
+            # 无参数的split()会去除首尾空白并合并连续空白
+            # split() without argument trims and collapses whitespace
+            words = payload.split()
+            if not words:
+                continue
             assert len(words) > 1, f'unexpected payload at index {index}, context: {msg}'
-            if words[0] in self.EVENT_TYPES:
-                current_event_type = words[0]
-                has_type_prefix = True
-            else:
-                has_type_prefix = False
-            assert current_event_type is not None, f'can not decide event type of payload at index {index}, context: {msg}'
-
-            if current_event_type == self.EVENT_TYPE_ARMOR:
-                parsed.append(self._parse_armor_event(words, has_type_prefix))
-            elif current_event_type == self.EVENT_TYPE_SOUND:
-                parsed.append(self._parse_sound_event(words, has_type_prefix))
+            parser = type_parsers.get(words[0])
+            if parser is not None:
+                current_parser = parser
+                offset = 2
             else:
-                raise ValueError(f'unknown event type {current_event_type} at index {index}, context: {msg}')
+                offset = 0
+            assert current_parser is not None, f'can not decide event type of payload at index {index}, context: {msg}'
+            parsed.append(current_parser(words, offset))
+        assert parsed, f'empty event, context: {msg}'
         return parsed
 
+    # 按事件子类型分派的解析函数
+    # parsers dispatched by event subtype
+    _ARMOR_PARSERS = {
+        ARMOR_HIT: lambda words: ArmorHitEvent(int(words[-2]), int(words[-1])),
+    }
+    _SOUND_PARSERS = {
+        SOUND_APPLAUSE: lambda words: SoundApplauseEvent(int(words[-1])),
+    }
+
     @staticmethod
-    def _parse_armor_event(words: List[str], has_type_prefix: bool):
-        subtype: str = ''
-        if has_type_prefix:
-            assert len(words) > 3, f'invalid armor event payload, words: {words}'
-            subtype = words[2]
-        else:
-            assert len(words) > 1, f'invalid armor event payload, words: {words}'
-            subtype = words[0]
+    def _parse_armor_event(words: List[str], offset: int):
+        assert len(words) > offset + 1, f'invalid armor event payload, words: {words}'
+        subtype = words[offset]
 
-        if subtype == ARMOR_HIT:
-            return ArmorHitEvent(int(words[-2]), int(words[-1]))
-        else:
+        parser = EventListener._ARMOR_PARSERS.get(subtype)
+        if parser is None:
             raise ValueError(f'unknown armor event subtype {subtype}, context: {words}')
+        return parser(words)
 
     @staticmethod
-    def _parse_sound_event(words: List[str], has_type_prefix: bool):
-        subtype: str = ''
-        if has_type_prefix:
-            assert len(words) > 3, f'invalid sound event payload, words: {words}'
-            subtype = words[2]
-        else:
-            assert len(words) > 1, f'invalid sound event payload, words: {words}'
-            subtype = words[0]
+    def _parse_sound_event(words: List[str], offset: int):
+        assert len(words) > offset + 1, f'invalid sound event payload, words: {words}'
+        subtype = words[offset]
 
-        if subtype == SOUND_APPLAUSE:
-            return SoundApplauseEvent(int(words[-1]))
-        else:
+        parser = EventListener._SOUND_PARSERS.get(subtype)
+        if parser is None:
             raise ValueError(f'unknown sound event subtype {subtype}, context: {words}')
+        return parser(words)
+
+    # 按事件类型分派，staticmethod在3.10之前不可直接调用
+    # dispatched by event type, staticmethod objects are not callable before Python 3.10
+    _TYPE_PARSERS = {
+        EVENT_TYPE_ARMOR: _parse_armor_event.__func__,
+        EVENT_TYPE_SOUND: _parse_sound_event.__func__,
+    }
 
     def work(self) -> None:
         try:
-            msg = self._intake(DEFAULT_BUF_SIZE).decode()
+            msg = self._intake_records()
         except OSError:
             if self.closed:
                 return
             else:
                 raise
         payloads = self._parse(msg)
+        if self._batch:
+            self._outlet(payloads)
+            return
+        outlet = self._outlet
         for payload in payloads:
-            self._outlet(payload)
+            outlet(payload)
 
 
 class Vision(Worker):
@@ -538,8 +900,11 @@ class Vision(Worker):
     """
 
     TIMEOUT: float = 5.0
+    # OpenCV支持时（4.5.2及以上）请求硬件解码，没有可用的硬件时OpenCV自动使用软件解码
+    # request hardware decoding when OpenCV supports it (4.5.2 and later), OpenCV falls back to software when no hardware is available
+    HW_ACCELERATION: bool = True
 
-    def __init__(self, name: str, out: Optional[mp.Queue], ip: str, processing: Callable[..., None], none_is_valid=False):
+    def __init__(self, name: str, out: Optional[mp.Queue], ip: str, processing: Callable[..., None], none_is_valid=False, reuse_frame: bool = False):
         """
         初始化自身。
 
@@ -556,21 +921,53 @@ class Vision(Worker):
             where frame is cv2(OpenCV) frame, and logger is for logging.
         :param none_is_valid: 是否在回调函数返回None时将None放入 ``out`` ，默认为False.
             Whether to put None returned from callback function into ``out``, default to False.
+        :param reuse_frame: 是否让OpenCV将每一帧解码到同一块内存中，省去每帧一次的大块内存分配，默认为False.
+            开启后，frame只在本次回调期间有效，回调函数不能保存或返回frame本身，需要时请使用 ``frame.copy()`` 。
+            Whether to let OpenCV decode every frame into the same memory, which saves a large allocation per frame, default to False.
+            When enabled, frame is only valid during the callback, the callback must not keep or return frame itself,
+            use ``frame.copy()`` if needed.
         """
+        # 构造期间收到信号时，close()可能在视频流打开之前被调用
+        # close() may be called by a signal during construction, before the stream is opened
+        self._cap = None
         super().__init__(name, out, None, (ip, VIDEO_PORT), self.TIMEOUT)
         self._none_is_valid = none_is_valid
+        self._reuse_frame: bool = reuse_frame
+        # 复用的帧缓冲，尺寸由第一帧决定
+        # reused frame buffer, sized by the first frame
+        self._frame = None
         self._processing = processing
-        self._cap = cv.VideoCapture(f'tcp://{ip}:{VIDEO_PORT}')
+        self._cap = self._open_capture(f'tcp://{ip}:{VIDEO_PORT}')
         assert self._cap.isOpened(), 'failed to connect to video stream'
-        self._cap.set(cv.CAP_PROP_BUFFERSIZE, 4)
+        self._cap.set(cv.CAP_PROP_BUFFERSIZE, 1)
+
+    def _open_capture(self, url: str):
+        if self.HW_ACCELERATION and hasattr(cv, 'CAP_PROP_HW_ACCELERATION'):
+            return cv.VideoCapture(url, cv.CAP_FFMPEG, [cv.CAP_PROP_HW_ACCELERATION, cv.VIDEO_ACCELERATION_ANY])
+        return cv.VideoCapture(url)
 
     def close(self):
-        self._cap.release()
+        if self._cap is not None:
+            self._cap.release()
         cv.destroyAllWindows()
         super().close()
 
     def work(self) -> None:
-        ok, frame = self._cap.read()
+        # 下游跟不上时，只grab不retrieve，跳过过时的帧，只处理最新的一帧，
+        # 避免帧在OpenCV内部积压导致延迟越来越大（FFmpeg后端会忽略CAP_PROP_BUFFERSIZE）。
+        # skip stale frames by grabbing without retrieving while downstream lags behind,
+        # so only the freshest frame is processed and frames do not pile up inside OpenCV
+        # (the FFmpeg backend ignores CAP_PROP_BUFFERSIZE).
+        ok = self._cap.grab()
+        while ok and self._out is not None and self._out.full() and not self.closed:
+            ok = self._cap.grab()
+        frame = None
+        if ok:
+            if self._reuse_frame:
+                ok, frame = self._cap.retrieve(self._frame)
+                self._frame = frame
+            else:
+                ok, frame = self._cap.retrieve()
         if not ok:
             if self.closed:
                 return
@@ -604,18 +1001,24 @@ class Mind(Worker):
             其中cmd为连接到机甲的Commander，queues为输入的队列元组，logger用于日志打印。
             callback function, is called in form ``processing(cmd=self._cmd, queues=self._queues, logger=self.logger)``,
             where cmd is a connected Commander, queue is the input tuple of mp.Queue, logger is for logging.
+            回调函数中可使用 ``drain_queues(queues, timeout)`` 同时等待所有输入队列。
+            ``drain_queues(queues, timeout)`` can be used in the callback to wait on all input queues at once.
         :param timeout: Commander的连接超时。
             timeout for Commander.
         :param loop: 是否循环调用回调函数processing
             whether calls processing(callback) function in loop, default to True.
         """
+        # 构造期间收到信号时，close()可能在Commander连接之前被调用
+        # close() may be called by a signal during construction, before Commander connects
+        self._cmd: Optional[Commander] = None
         super().__init__(name, None, None, (ip, 0), timeout, loop=loop)
         self._queues = queues
         self._processing = processing
         self._cmd = Commander(ip, timeout)
 
     def close(self):
-        self._cmd.close()
+        if self._cmd is not None:
+            self._cmd.close()
         super().close()
 
     def work(self) -> None:
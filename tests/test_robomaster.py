@@ -7,21 +7,70 @@
 # ██║  ██║╚██████╔╝██████╔╝╚██████╔╝██║ ╚═╝ ██║██║  ██║███████║   ██║   ███████╗██║  ██║██║        ██║
 # ╚═╝  ╚═╝ ╚═════╝ ╚═════╝  ╚═════╝ ╚═╝     ╚═╝╚═╝  ╚═╝╚══════╝   ╚═╝   ╚══════╝╚═╝  ╚═╝╚═╝        ╚═╝
 
+import asyncio
+import logging
+import math
+import os
+import queue
+import signal
 import socket
-from unittest import TestCase
-from unittest.mock import patch
+import time
+from unittest import TestCase, skipUnless
+from unittest.mock import MagicMock, patch
+
+import cv2 as cv
 
 import robomasterpy
 from robomasterpy import Commander
 from robomasterpy import framework
 
 
+def feed(*chunks):
+    """
+    build a side effect for socket.recv_into which replies chunks in order.
+    """
+    chunks = list(chunks)
+
+    def recv_into(buf, nbytes=0, flags=0):
+        chunk = chunks.pop(0)
+        if isinstance(chunk, BaseException):
+            raise chunk
+        buf[:len(chunk)] = chunk
+        return len(chunk)
+
+    return recv_into
+
+
 class TestConnection(TestCase):
     def test_get_broadcast_ip(self):
         with patch.object(socket.socket, 'recvfrom', return_value=(b'robot ip 192.168.42.42', ('192.168.42.42', 40101))):
             ip = robomasterpy.get_broadcast_ip(2)
             self.assertEqual('192.168.42.42', ip)
 
+    def test_get_broadcast_ip_skip_stray(self):
+        msgs = [
+            (b'whatever', ('192.168.42.7', 40101)),
+            (b'robot ip 192.168.42.1', ('192.168.42.42', 40101)),
+            (b'robot ip 192.168.42.42', ('192.168.42.42', 40101)),
+        ]
+        with patch.object(socket.socket, 'recvfrom', side_effect=msgs):
+            ip = robomasterpy.get_broadcast_ip(2)
+            self.assertEqual('192.168.42.42', ip)
+
+    def test_get_broadcast_ips(self):
+        msgs = [
+            (b'robot ip 192.168.42.42', ('192.168.42.42', 40101)),
+            (b'whatever', ('192.168.42.7', 40101)),
+            (b'robot ip 192.168.42.42', ('192.168.42.42', 40101)),
+            (b'robot ip 192.168.42.43', ('192.168.42.43', 40101)),
+            socket.timeout(),
+        ]
+        with patch.object(socket.socket, 'recvfrom', side_effect=msgs):
+            self.assertEqual(['192.168.42.42', '192.168.42.43'], robomasterpy.get_broadcast_ips(3, 2))
+        with patch.object(socket.socket, 'recvfrom', side_effect=msgs):
+            self.assertEqual(['192.168.42.42'], robomasterpy.get_broadcast_ips(1, 2))
+        self.assertRaises(ValueError, robomasterpy.get_broadcast_ips, 0)
+
 
 class TestCommander(TestCase):
     @patch('socket.socket')
@@ -30,18 +79,92 @@ class TestCommander(TestCase):
         TIMEOUT = 42.1234
 
         m = mock_socket()
-        m.recv.return_value = b'ok'
+        m.recv_into.side_effect = feed(b'ok;')
         self.commander = Commander(ip=IP, timeout=TIMEOUT)
         m.settimeout.assert_called_with(TIMEOUT)
         m.connect.assert_called_with((IP, robomasterpy.CTRL_PORT))
-        m.recv.assert_called_with(robomasterpy.DEFAULT_BUF_SIZE)
-        m.send.assert_called_with(b'command;')
-        m.recv.assert_called_once()
+        m.sendall.assert_called_with(b'command;')
+        m.recv_into.assert_called_once()
+
+    def test_context_manager(self):
+        conn = self.commander._conn
+        with self.commander as commander:
+            self.assertIs(self.commander, commander)
+        conn.close.assert_called_once()
+        self.commander.close()
+        conn.close.assert_called_once()
+        self.assertRaises(AssertionError, self.commander.version)
 
     def test__is_ok(self):
         self.assertTrue(Commander._is_ok('ok'))
         self.assertFalse(Commander._is_ok('fail'))
 
+    def test__do_fragmented_response(self):
+        self.commander._conn.recv_into.side_effect = feed(b'-20 -50', b'.5 -70 ;')
+        self.assertEqual('-20 -50.5 -70', self.commander.do('chassis', 'attitude', '?'))
+        self.commander._conn.sendall.assert_called_with(b'chassis attitude ?;')
+
+    def test__do_raw_bytes_response(self):
+        self.commander._conn.recv_into.side_effect = feed(b'-20 -50', b'.5 -70 ;')
+        self.assertEqual(robomasterpy.ChassisAttitude(-20, -50.5, -70), self.commander.get_chassis_attitude())
+        self.commander._conn.sendall.assert_called_with(b'chassis attitude ?;')
+
+    def test_fire_and_forget(self):
+        conn = self.commander._conn
+        conn.recv_into.reset_mock()
+        conn.recv_into.side_effect = feed(b'ok;fail;', b'ok;', b'42;')
+        self.commander.fire_and_forget('chassis', 'speed', 'x', 0.5, 'y', 0, 'z', 0)
+        conn.sendall.assert_called_with(b'chassis speed x 0.5 y 0 z 0;')
+        self.commander.fire_and_forget('gimbal', 'speed', 'p', 10, 'y', 0)
+        self.commander.fire_and_forget('blaster', 'fire')
+        conn.recv_into.assert_not_called()
+        # responses left behind are consumed before the regular one
+        with self.assertLogs('robomasterpy.client', level='WARNING') as logs:
+            self.assertEqual('42', self.commander.do('armor', 'sensitivity', '?'))
+        self.assertEqual(["WARNING:robomasterpy.client:Commander: unacknowledged command failed: b'fail'"], logs.output)
+        self.assertEqual(0, self.commander._unacked)
+
+    @patch('robomasterpy.client._HAS_SENDMSG', True)
+    def test__do_ok_response(self):
+        self.commander._conn.recv_into.side_effect = feed(b'ok ;ok;fail;')
+        self.commander._conn.sendmsg.side_effect = lambda chunks: sum(map(len, chunks))
+        self.assertEqual(['ok', 'ok', 'fail'], self.commander.do_many([('stream', 'on'), ('audio', 'on'), ('blaster', 'fire')]))
+
+    @patch('robomasterpy.client._HAS_SENDMSG', True)
+    def test_do_many(self):
+        conn = self.commander._conn
+        conn.recv_into.side_effect = feed(b'ok;1 2 3', b';ok ;')
+        conn.sendmsg.side_effect = lambda chunks: sum(map(len, chunks))
+        self.assertEqual(['ok', '1 2 3', 'ok'], self.commander.do_many([('gimbal', 'recenter'), ('chassis', 'position', '?'), ('blaster', 'fire')]))
+        conn.sendmsg.assert_called_with([b'gimbal recenter;', b'chassis position ?;', b'blaster fire;'])
+
+    @patch('robomasterpy.client.RECV_BUF_SIZE', 8)
+    @patch('socket.socket')
+    def test_response_exceeds_buffer(self, mock_socket):
+        mock_socket().recv_into.side_effect = feed(b'ok;', b'12345678', b'9;')
+        commander = Commander(ip='127.0.0.1', timeout=1)
+        self.assertRaisesRegex(ConnectionError, 'exceeds receive buffer', commander.do, 'version', '?')
+
+    @patch('robomasterpy.client._HAS_SENDMSG', True)
+    @patch('robomasterpy.client._IOV_MAX', 2)
+    def test_do_many_beyond_iov_max(self):
+        conn = self.commander._conn
+        conn.recv_into.side_effect = feed(b'ok;ok;ok;')
+        conn.sendmsg.side_effect = lambda chunks: sum(map(len, chunks))
+        self.assertEqual(['ok', 'ok', 'ok'], self.commander.do_many([('gimbal', 'recenter'), ('blaster', 'fire'), ('stream', 'on')]))
+        self.assertEqual([
+            (([b'gimbal recenter;', b'blaster fire;'],),),
+            (([b'stream on;'],),),
+        ], conn.sendmsg.call_args_list)
+
+    @patch('robomasterpy.client._HAS_SENDMSG', True)
+    def test_do_many_partial_send(self):
+        conn = self.commander._conn
+        conn.recv_into.side_effect = feed(b'ok;ok;')
+        conn.sendmsg.return_value = 5
+        self.assertEqual(['ok', 'ok'], self.commander.do_many([('gimbal', 'recenter'), ('blaster', 'fire')]))
+        conn.sendall.assert_called_with(b'l recenter;blaster fire;')
+
     def test_version(self):
         VERSION = '1.2.3.4.5'
 
@@ -49,15 +172,22 @@ class TestCommander(TestCase):
             self.assertEqual(VERSION, self.commander.version())
             m.assert_called_with('version')
 
+    def test_do_unhashable_arg(self):
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
+            self.assertEqual('ok', self.commander.do('whatever', [1, 2]))
+            m.assert_called_with(b'whatever [1, 2];')
+
     def test_chassis_speed(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.chassis_speed(1.1, 1.2, 1.3))
-            m.assert_called_with('chassis', 'speed', 'x', 1.1, 'y', 1.2, 'z', 1.3)
+            m.assert_called_with(b'chassis speed x 1.1 y 1.2 z 1.3;')
+            self.commander.chassis_speed(1e-07, 0, -0.25)
+            m.assert_called_with(b'chassis speed x 1e-07 y 0 z -0.25;')
 
     def test_robot_mode(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.robot_mode(robomasterpy.MODE_FREE))
-            m.assert_called_with('robot', 'mode', robomasterpy.MODE_FREE)
+            m.assert_called_with(b'robot mode free;')
 
     def test_get_robot_mode(self):
         with patch('robomasterpy.Commander._do', return_value=robomasterpy.MODE_GIMBAL_LEAD) as m:
@@ -65,12 +195,14 @@ class TestCommander(TestCase):
             m.assert_called_with('robot', 'mode', '?')
 
     def test_chassis_wheel(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.chassis_wheel(-1, -2, -3, -4))
-            m.assert_called_with('chassis', 'wheel', 'w1', -1, 'w2', -2, 'w3', -3, 'w4', -4)
+            m.assert_called_with(b'chassis wheel w1 -1 w2 -2 w3 -3 w4 -4;')
+            self.commander.chassis_wheel(1.5, 0, 0, 0)
+            m.assert_called_with(b'chassis wheel w1 1.5 w2 0 w3 0 w4 0;')
 
     def test_chassis_wheel_out_of_range(self):
-        self.assertRaises(AssertionError, self.commander.chassis_wheel, 0, -2000, -3, -4)
+        self.assertRaises(ValueError, self.commander.chassis_wheel, 0, -2000, -3, -4)
 
     def test_chassis_move(self):
         with patch('robomasterpy.Commander._do', return_value='ok') as m:
@@ -82,87 +214,110 @@ class TestCommander(TestCase):
             m.assert_called_with('chassis', 'move', 'x', 5, 'y', 4, 'z', 3, 'vxy', 2, 'vz', 1)
 
     def test_chassis_move_out_of_range(self):
-        self.assertRaises(AssertionError, self.commander.chassis_move, 6)
-        self.assertRaises(AssertionError, self.commander.chassis_move, 5, 6)
-        self.assertRaises(AssertionError, self.commander.chassis_move, 5, 5, 1801)
-        self.assertRaises(AssertionError, self.commander.chassis_move, 5, 5, 5, 3.6)
-        self.assertRaises(AssertionError, self.commander.chassis_move, 5, 5, 5, 0)
-        self.assertRaises(AssertionError, self.commander.chassis_move, 5, 5, 5, 3.5, 0)
-        self.assertRaises(AssertionError, self.commander.chassis_move, 5, 5, 5, 3.5, 601)
+        self.assertRaises(ValueError, self.commander.chassis_move, 6)
+        self.assertRaises(ValueError, self.commander.chassis_move, 5, 6)
+        self.assertRaises(ValueError, self.commander.chassis_move, 5, 5, 1801)
+        self.assertRaises(ValueError, self.commander.chassis_move, 5, 5, 5, 3.6)
+        self.assertRaises(ValueError, self.commander.chassis_move, 5, 5, 5, 0)
+        self.assertRaises(ValueError, self.commander.chassis_move, 5, 5, 5, 3.5, 0)
+        self.assertRaises(ValueError, self.commander.chassis_move, 5, 5, 5, 3.5, 601)
 
     def test_get_chassis_speed(self):
-        with patch('robomasterpy.Commander._do', return_value='1 2 30 100 150 200 250') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'1 2 30 100 150 200 250') as m:
             self.assertEqual(robomasterpy.ChassisSpeed(1, 2, 30, 100, 150, 200, 250), self.commander.get_chassis_speed())
-            m.assert_called_with('chassis', 'speed', '?')
+            m.assert_called_with(b'chassis speed ?;', True)
 
     def test_get_chassis_speed_raise(self):
-        with patch('robomasterpy.Commander._do', return_value='fail') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'fail') as m:
             self.assertRaises(AssertionError, self.commander.get_chassis_speed)
 
     def test_get_chassis_position(self):
-        with patch('robomasterpy.Commander._do', return_value='1 1.5 20') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'1 1.5 20') as m:
             self.assertEqual(robomasterpy.ChassisPosition(1, 1.5, 20), self.commander.get_chassis_position())
-            m.assert_called_with('chassis', 'position', '?')
+            m.assert_called_with(b'chassis position ?;', True)
 
     def test_get_chassis_position_raise(self):
-        with patch('robomasterpy.Commander._do', return_value='fail') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'fail') as m:
             self.assertRaises(AssertionError, self.commander.get_chassis_position)
 
     def test_get_chassis_attitude(self):
-        with patch('robomasterpy.Commander._do', return_value='-20 -50.5 -70') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'-20 -50.5 -70') as m:
             self.assertEqual(robomasterpy.ChassisAttitude(-20, -50.5, -70), self.commander.get_chassis_attitude())
-            m.assert_called_with('chassis', 'attitude', '?')
+            m.assert_called_with(b'chassis attitude ?;', True)
 
     def test_get_chassis_attitude_raise(self):
-        with patch('robomasterpy.Commander._do', return_value='fail') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'fail') as m:
             self.assertRaises(AssertionError, self.commander.get_chassis_attitude)
 
     def test_get_chassis_status(self):
         TRUES = [True for i in range(11)]
         FALSES = [False for i in range(11)]
 
-        with patch('robomasterpy.Commander._do', return_value='1 1 1 1 1 1 1 1 1 1 1') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'1 1 1 1 1 1 1 1 1 1 1') as m:
             self.assertEqual(robomasterpy.ChassisStatus(*TRUES), self.commander.get_chassis_status())
-            m.assert_called_with('chassis', 'status', '?')
+            m.assert_called_with(b'chassis status ?;', True)
 
-        with patch('robomasterpy.Commander._do', return_value='0 0 0 0 0 0 0 0 0 0 0') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'0 0 0 0 0 0 0 0 0 0 0') as m:
             self.assertEqual(robomasterpy.ChassisStatus(*FALSES), self.commander.get_chassis_status())
-            m.assert_called_with('chassis', 'status', '?')
+            m.assert_called_with(b'chassis status ?;', True)
+
+        with patch('robomasterpy.Commander._do_raw', return_value=b'0 1 0 0 0 0 0 0 0 0 1') as m:
+            self.assertEqual(robomasterpy.ChassisStatus(False, True, *FALSES[:8], True), self.commander.get_chassis_status())
+
+        with patch('robomasterpy.Commander._do_raw', return_value=b'0 1 0') as m:
+            self.assertRaises(AssertionError, self.commander.get_chassis_status)
+
+        with patch('robomasterpy.Commander._do_raw', return_value=b'0 1 0 0 0 0 0 0 0 0 x') as m:
+            self.assertRaises(AssertionError, self.commander.get_chassis_status)
+
+        with patch('robomasterpy.Commander._do_raw', return_value=b'0 1 0 0 0 0 0 0 0 0 2') as m:
+            self.assertRaises(AssertionError, self.commander.get_chassis_status)
+
+    def test_chassis_status_mask(self):
+        status = robomasterpy.ChassisStatus(True, False, False, True, False, False, False, False, False, False, True)
+        self.assertEqual(0b10000001001, status.mask)
+        self.assertEqual(status, robomasterpy.ChassisStatus.from_mask(status.mask))
+        self.assertEqual(0, robomasterpy.ChassisStatus.from_mask(0).mask)
 
     def test_chassis_push_on(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.chassis_push_on(all_freq=5))
-            m.assert_called_with('chassis', 'push', 'freq', 5)
+            m.assert_called_with(b'chassis push freq 5;')
             self.assertEqual('ok', self.commander.chassis_push_on(all_freq=10, position_freq=5))
-            m.assert_called_with('chassis', 'push', 'freq', 10)
+            m.assert_called_with(b'chassis push freq 10;')
             self.assertEqual('ok', self.commander.chassis_push_on(position_freq=10, attitude_freq=20, status_freq=30))
-            m.assert_called_with('chassis', 'push', 'position', 'on', 'pfreq', 10, 'attitude', 'on', 'afreq', 20, 'status', 'on', 'sfreq', 30)
+            m.assert_called_with(b'chassis push position on pfreq 10 attitude on afreq 20 status on sfreq 30;')
+            self.assertEqual('ok', self.commander.chassis_push_on(attitude_freq=5, status_freq=1))
+            m.assert_called_with(b'chassis push attitude on afreq 5 status on sfreq 1;')
+            self.assertEqual('ok', self.commander.chassis_push_on(position_freq=20, attitude_freq=20, status_freq=20))
+            m.assert_called_with(b'chassis push freq 20;')
 
     def test_chassis_push_on_raise(self):
-        self.assertRaises(AssertionError, self.commander.chassis_push_on)
+        self.assertRaises(ValueError, self.commander.chassis_push_on)
+        self.assertRaises(ValueError, self.commander.chassis_push_on, position_freq=10, status_freq=15)
 
     def test_chassis_push_off(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.chassis_push_off(all=True))
-            m.assert_called_with('chassis', 'push', 'position', 'off', 'attitude', 'off', 'status', 'off')
+            m.assert_called_with(b'chassis push position off attitude off status off;')
             self.assertEqual('ok', self.commander.chassis_push_off(position=True, attitude=True, status=True))
-            m.assert_called_with('chassis', 'push', 'position', 'off', 'attitude', 'off', 'status', 'off')
+            m.assert_called_with(b'chassis push position off attitude off status off;')
             self.assertEqual('ok', self.commander.chassis_push_off(status=True))
-            m.assert_called_with('chassis', 'push', 'status', 'off')
+            m.assert_called_with(b'chassis push status off;')
 
     def test_chassis_push_off_raise(self):
-        self.assertRaises(AssertionError, self.commander.chassis_push_off)
+        self.assertRaises(ValueError, self.commander.chassis_push_off)
 
     def test_gimbal_speed(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.gimbal_speed(15, 20))
-            m.assert_called_with('gimbal', 'speed', 'p', 15, 'y', 20)
+            m.assert_called_with(b'gimbal speed p 15 y 20;')
 
     def test_gimbal_speed_raise(self):
-        self.assertRaises(AssertionError, self.commander.gimbal_speed, -451, 450)
-        self.assertRaises(AssertionError, self.commander.gimbal_speed, 450, 451)
-        self.assertRaises(AssertionError, self.commander.gimbal_speed, 451, 450)
-        self.assertRaises(AssertionError, self.commander.gimbal_speed, 450, -451)
+        self.assertRaises(ValueError, self.commander.gimbal_speed, -451, 450)
+        self.assertRaises(ValueError, self.commander.gimbal_speed, 450, 451)
+        self.assertRaises(ValueError, self.commander.gimbal_speed, 451, 450)
+        self.assertRaises(ValueError, self.commander.gimbal_speed, 450, -451)
 
     def test_gimbal_move(self):
         with patch('robomasterpy.Commander._do', return_value='ok') as m:
@@ -174,10 +329,10 @@ class TestCommander(TestCase):
             m.assert_called_with('gimbal', 'move', 'p', 42, 'y', -42, 'vp', 120, 'vy', 150)
 
     def test_gimbal_move_raise(self):
-        self.assertRaises(AssertionError, self.commander.gimbal_move, 56, 55)
-        self.assertRaises(AssertionError, self.commander.gimbal_move, 55, -56)
-        self.assertRaises(AssertionError, self.commander.gimbal_move, 0, 0, 541)
-        self.assertRaises(AssertionError, self.commander.gimbal_move, 0, 0, 1, 541)
+        self.assertRaises(ValueError, self.commander.gimbal_move, 56, 55)
+        self.assertRaises(ValueError, self.commander.gimbal_move, 55, -56)
+        self.assertRaises(ValueError, self.commander.gimbal_move, 0, 0, 541)
+        self.assertRaises(ValueError, self.commander.gimbal_move, 0, 0, 1, 541)
 
     def test_gimbal_moveto(self):
         with patch('robomasterpy.Commander._do', return_value='ok') as m:
@@ -189,10 +344,10 @@ class TestCommander(TestCase):
             m.assert_called_with('gimbal', 'moveto', 'p', 12, 'y', -12, 'vp', 120, 'vy', 150)
 
     def test_gimbal_moveto_raise(self):
-        self.assertRaises(AssertionError, self.commander.gimbal_moveto, 56, 55)
-        self.assertRaises(AssertionError, self.commander.gimbal_moveto, 55, -56)
-        self.assertRaises(AssertionError, self.commander.gimbal_moveto, 0, 0, 541)
-        self.assertRaises(AssertionError, self.commander.gimbal_moveto, 0, 0, 1, 541)
+        self.assertRaises(ValueError, self.commander.gimbal_moveto, 56, 55)
+        self.assertRaises(ValueError, self.commander.gimbal_moveto, 55, -56)
+        self.assertRaises(ValueError, self.commander.gimbal_moveto, 0, 0, 541)
+        self.assertRaises(ValueError, self.commander.gimbal_moveto, 0, 0, 1, 541)
 
     def test_gimbal_suspend(self):
         with patch('robomasterpy.Commander._do', return_value='ok') as m:
@@ -210,9 +365,9 @@ class TestCommander(TestCase):
             m.assert_called_with('gimbal', 'recenter')
 
     def test_get_gimbal_attitude(self):
-        with patch('robomasterpy.Commander._do', return_value='-10 20') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value=b'-10 20') as m:
             self.assertEqual(robomasterpy.GimbalAttitude(-10, 20), self.commander.get_gimbal_attitude())
-            m.assert_called_with('gimbal', 'attitude', '?')
+            m.assert_called_with(b'gimbal attitude ?;', True)
 
     def test_gimbal_push_on(self):
         with patch('robomasterpy.Commander._do', return_value='ok') as m:
@@ -220,15 +375,15 @@ class TestCommander(TestCase):
             m.assert_called_with('gimbal', 'push', 'attitude', 'on', 'afreq', 20)
 
     def test_gimbal_push_on_raise(self):
-        self.assertRaises(AssertionError, self.commander.gimbal_push_on, 17)
+        self.assertRaises(ValueError, self.commander.gimbal_push_on, 17)
 
     def test_gimbal_push_off(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.gimbal_push_off(True))
-            m.assert_called_with('gimbal', 'push', 'attitude', 'off')
+            m.assert_called_with(b'gimbal push attitude off;')
 
     def test_gimbal_push_off_raise(self):
-        self.assertRaises(AssertionError, self.commander.chassis_push_off, False)
+        self.assertRaises(ValueError, self.commander.chassis_push_off, False)
 
     def test_armor_sensitivity(self):
         with patch('robomasterpy.Commander._do', return_value='ok') as m:
@@ -236,8 +391,8 @@ class TestCommander(TestCase):
             m.assert_called_with('armor', 'sensitivity', 8)
 
     def test_armor_sensitivity_raise(self):
-        self.assertRaises(AssertionError, self.commander.armor_sensitivity, 0)
-        self.assertRaises(AssertionError, self.commander.armor_sensitivity, 11)
+        self.assertRaises(ValueError, self.commander.armor_sensitivity, 0)
+        self.assertRaises(ValueError, self.commander.armor_sensitivity, 11)
 
     def test_get_armor_sensitivity(self):
         with patch('robomasterpy.Commander._do', return_value='7') as m:
@@ -245,45 +400,47 @@ class TestCommander(TestCase):
             m.assert_called_with('armor', 'sensitivity', '?')
 
     def test_armor_event(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.armor_event(robomasterpy.ARMOR_HIT, True))
-            m.assert_called_with('armor', 'event', robomasterpy.ARMOR_HIT, 'on')
+            m.assert_called_with(b'armor event hit on;')
             self.assertEqual('ok', self.commander.armor_event(robomasterpy.ARMOR_HIT, False))
-            m.assert_called_with('armor', 'event', robomasterpy.ARMOR_HIT, 'off')
+            m.assert_called_with(b'armor event hit off;')
 
     def test_armor_event_raise(self):
-        self.assertRaises(AssertionError, self.commander.armor_event, 'whatever', True)
-        self.assertRaises(AssertionError, self.commander.armor_event, 'whatever', False)
+        self.assertRaises(ValueError, self.commander.armor_event, 'whatever', True)
+        self.assertRaises(ValueError, self.commander.armor_event, 'whatever', False)
 
     def test_sound_event(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.sound_event(robomasterpy.SOUND_APPLAUSE, True))
-            m.assert_called_with('sound', 'event', robomasterpy.SOUND_APPLAUSE, 'on')
+            m.assert_called_with(b'sound event applause on;')
             self.assertEqual('ok', self.commander.sound_event(robomasterpy.SOUND_APPLAUSE, False))
-            m.assert_called_with('sound', 'event', robomasterpy.SOUND_APPLAUSE, 'off')
+            m.assert_called_with(b'sound event applause off;')
 
     def test_sound_event_raise(self):
-        self.assertRaises(AssertionError, self.commander.sound_event, 'whatever', True)
-        self.assertRaises(AssertionError, self.commander.sound_event, 'whatever', False)
+        self.assertRaises(ValueError, self.commander.sound_event, 'whatever', True)
+        self.assertRaises(ValueError, self.commander.sound_event, 'whatever', False)
 
     def test_led_control(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.led_control(robomasterpy.LED_TOP_ALL, robomasterpy.LED_EFFECT_SCROLLING, 255, 128, 64))
-            m.assert_called_with('led', 'control', 'comp', robomasterpy.LED_TOP_ALL, 'r', 255, 'g', 128, 'b', 64, 'effect', robomasterpy.LED_EFFECT_SCROLLING)
+            m.assert_called_with(b'led control comp top_all r 255 g 128 b 64 effect scrolling;')
+            self.commander.led_control(robomasterpy.LED_TOP_ALL, robomasterpy.LED_EFFECT_SOLID, 127.5, 0, 0)
+            m.assert_called_with(b'led control comp top_all r 127.5 g 0 b 0 effect solid;')
 
     def test_led_raise(self):
-        self.assertRaises(AssertionError, self.commander.led_control, 'whatever', robomasterpy.LED_EFFECT_SCROLLING, 255, 128, 64)
-        self.assertRaises(AssertionError, self.commander.led_control, robomasterpy.LED_ALL, 'whatever', 255, 128, 64)
-        self.assertRaises(AssertionError, self.commander.led_control, robomasterpy.LED_TOP_ALL, robomasterpy.LED_EFFECT_SCROLLING, 256, 128, 64)
-        self.assertRaises(AssertionError, self.commander.led_control, robomasterpy.LED_TOP_ALL, robomasterpy.LED_EFFECT_SCROLLING, 255, 256, 64)
-        self.assertRaises(AssertionError, self.commander.led_control, robomasterpy.LED_TOP_ALL, robomasterpy.LED_EFFECT_SCROLLING, 255, 255, 256)
+        self.assertRaises(ValueError, self.commander.led_control, 'whatever', robomasterpy.LED_EFFECT_SCROLLING, 255, 128, 64)
+        self.assertRaises(ValueError, self.commander.led_control, robomasterpy.LED_ALL, 'whatever', 255, 128, 64)
+        self.assertRaises(ValueError, self.commander.led_control, robomasterpy.LED_TOP_ALL, robomasterpy.LED_EFFECT_SCROLLING, 256, 128, 64)
+        self.assertRaises(ValueError, self.commander.led_control, robomasterpy.LED_TOP_ALL, robomasterpy.LED_EFFECT_SCROLLING, 255, 256, 64)
+        self.assertRaises(ValueError, self.commander.led_control, robomasterpy.LED_TOP_ALL, robomasterpy.LED_EFFECT_SCROLLING, 255, 255, 256)
 
     def test_ir_sensor_measure(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.ir_sensor_measure(True))
-            m.assert_called_with('ir_distance_sensor', 'measure', 'on')
+            m.assert_called_with(b'ir_distance_sensor measure on;')
             self.assertEqual('ok', self.commander.ir_sensor_measure(False))
-            m.assert_called_with('ir_distance_sensor', 'measure', 'off')
+            m.assert_called_with(b'ir_distance_sensor measure off;')
 
     def test_get_ir_sensor_distance(self):
         with patch('robomasterpy.Commander._do', return_value='57.3456') as m:
@@ -291,65 +448,484 @@ class TestCommander(TestCase):
             m.assert_called_with('ir_distance_sensor', 'distance', 4, '?')
 
     def test_get_ir_sensor_distance_raise(self):
-        self.assertRaises(AssertionError, self.commander.get_ir_sensor_distance, 0)
-        self.assertRaises(AssertionError, self.commander.get_ir_sensor_distance, 5)
+        self.assertRaises(ValueError, self.commander.get_ir_sensor_distance, 0)
+        self.assertRaises(ValueError, self.commander.get_ir_sensor_distance, 5)
 
     def test_stream(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.stream(True))
-            m.assert_called_with('stream', 'on')
+            m.assert_called_with(b'stream on;')
             self.assertEqual('ok', self.commander.stream(False))
-            m.assert_called_with('stream', 'off')
+            m.assert_called_with(b'stream off;')
 
     def test_audio(self):
-        with patch('robomasterpy.Commander._do', return_value='ok') as m:
+        with patch('robomasterpy.Commander._do_raw', return_value='ok') as m:
             self.assertEqual('ok', self.commander.audio(True))
-            m.assert_called_with('audio', 'on')
+            m.assert_called_with(b'audio on;')
             self.assertEqual('ok', self.commander.audio(False))
-            m.assert_called_with('audio', 'off')
+            m.assert_called_with(b'audio off;')
 
 
-class TestPushListener(TestCase):
-    def test__parse(self):
-        with patch('robomasterpy.framework.PushListener.__init__', return_value=None):
-            # noinspection PyArgumentList
-            listener = framework.PushListener()
-            ans = listener._parse('chassis push attitude -0.894 -0.117 0.423 ; status 0 1 0 0 0 0 0 0 0 0 0 ;gimbal push attitude -0.300 -0.100 ;chassis push position 0.001 0.000 ; attitude -0.892 -0.115 0.422 ;')
-            self.assertEqual([
-                robomasterpy.ChassisAttitude(pitch=-0.894, roll=-0.117, yaw=0.423),
-                robomasterpy.ChassisStatus(static=False, uphill=True, downhill=False, on_slope=False, pick_up=False, slip=False, impact_x=False, impact_y=False, impact_z=False, roll_over=False, hill_static=False),
-                robomasterpy.GimbalAttitude(pitch=-0.3, yaw=-0.1),
-                robomasterpy.ChassisPosition(x=0.001, y=0.0, z=None),
-                robomasterpy.ChassisAttitude(pitch=-0.892, roll=-0.115, yaw=0.422),
-            ], ans)
+class TestCommanderNotThreadSafe(TestCase):
+    @patch('socket.socket')
+    def test_version(self, mock_socket):
+        m = mock_socket()
+        m.recv_into.side_effect = feed(b'ok;', b'1.2.3;')
+        commander = Commander(ip='127.0.0.1', thread_safe=False)
+        self.assertEqual('1.2.3', commander.version())
+        m.sendall.assert_called_with(b'version;')
+
+
+class TestAsyncCommander(TestCase):
+    RESPONSES = {
+        b'command;': b'ok;',
+        b'chassis position ?;': b'1 1.5 ',
+        b'gimbal attitude ?;': b'-10 20 ;',
+    }
+
+    async def _serve(self, reader, writer):
+        while True:
+            try:
+                cmd = await reader.readuntil(b';')
+            except asyncio.IncompleteReadError:
+                break
+            resp = self.RESPONSES.get(cmd, b'ok;')
+            # split responses across writes on purpose
+            writer.write(resp)
+            await writer.drain()
+            if not resp.endswith(b';'):
+                writer.write(b';')
+        writer.close()
+
+    def test_do(self):
+        async def run():
+            server = await asyncio.start_server(self._serve, '127.0.0.1', robomasterpy.CTRL_PORT)
+            try:
+                async with robomasterpy.AsyncCommander('127.0.0.1', 2) as cmd:
+                    self.assertEqual('127.0.0.1', cmd.get_ip())
+                    self.assertEqual('1 1.5', await cmd.do('chassis', 'position', '?'))
+                    self.assertEqual(['ok', '-10 20', 'ok'], await cmd.do_many([('gimbal', 'recenter'), ('gimbal', 'attitude', '?'), ('blaster', 'fire')]))
+                    # pipelined concurrent callers get their own responses
+                    self.assertEqual(['1 1.5', '-10 20', 'ok'], await asyncio.gather(
+                        cmd.do('chassis', 'position', '?'),
+                        cmd.do('gimbal', 'attitude', '?'),
+                        cmd.do('blaster', 'fire'),
+                    ))
+                with self.assertRaises(AssertionError):
+                    await cmd.do('version')
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    def test_connect_refused_handshake(self):
+        self.RESPONSES = {**TestAsyncCommander.RESPONSES, b'command;': b'error;'}
+
+        async def run():
+            server = await asyncio.start_server(self._serve, '127.0.0.1', robomasterpy.CTRL_PORT)
+            try:
+                cmd = robomasterpy.AsyncCommander('127.0.0.1', 2)
+                with self.assertRaises(AssertionError):
+                    await cmd.connect()
+                # the connection and the reader task are released
+                self.assertTrue(cmd._reader_task.done())
+                self.assertTrue(cmd._writer.is_closing())
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    def test_pool(self):
+        async def run():
+            server = await asyncio.start_server(self._serve, '127.0.0.1', robomasterpy.CTRL_PORT)
+            try:
+                async with robomasterpy.AsyncCommanderPool(['127.0.0.1', '127.0.0.1'], 2) as pool:
+                    self.assertEqual(2, len(pool))
+                    self.assertEqual(['127.0.0.1', '127.0.0.1'], pool.get_ips())
+                    self.assertEqual(['-10 20', '-10 20'], await pool.broadcast('gimbal', 'attitude', '?'))
+                    self.assertEqual(['1 1.5', 'ok'], await pool.dispatch([('chassis', 'position', '?'), ('blaster', 'fire')]))
+                    self.assertEqual('ok', await pool[1].do('blaster', 'fire'))
+                    with self.assertRaises(ValueError):
+                        await pool.dispatch([('blaster', 'fire')])
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run())
+        finally:
+            loop.close()
+
+    def test_pool_without_ip(self):
+        self.assertRaises(ValueError, robomasterpy.AsyncCommanderPool, [])
+
+
+def build_listener(listener_class, *args, **kwargs):
+    """
+    build a listener through its real constructor on a mocked socket.
+    """
+    with patch('socket.socket') as mock_socket:
+        mock_socket.return_value.getsockopt.return_value = framework.Worker.RCVBUF_SIZE
+        return listener_class(*args, **kwargs)
+
+
+def build_vision(*args, **kwargs):
+    """
+    build a Vision through its real constructor on a mocked video capture, return the vision and the capture.
+    """
+    with patch('robomasterpy.framework.cv.VideoCapture') as video_capture:
+        video_capture.return_value.isOpened.return_value = True
+        return framework.Vision(*args, **kwargs), video_capture.return_value
+
+
+class DroppingPushListener(framework.PushListener):
+    DROP_ON_FULL = True
+
+
+class SoftwareVision(framework.Vision):
+    HW_ACCELERATION = False
 
-            ans = listener._parse('gimbal push attitude -0.300 -0.100 ;')
-            self.assertEqual([robomasterpy.GimbalAttitude(pitch=-0.3, yaw=-0.1)], ans)
 
-            self.assertRaises(AssertionError, listener._parse, '')
-            self.assertRaises(AssertionError, listener._parse, 'whatever')
+class TestPushListener(TestCase):
+    def test__parse(self):
+        listener = build_listener(framework.PushListener, 'push-listener', queue.Queue())
+        ans = listener._parse('chassis push attitude -0.894 -0.117 0.423 ; status 0 1 0 0 0 0 0 0 0 0 0 ;gimbal push attitude -0.300 -0.100 ;chassis push position 0.001 0.000 ; attitude -0.892 -0.115 0.422 ;')
+        self.assertEqual([
+            robomasterpy.ChassisAttitude(pitch=-0.894, roll=-0.117, yaw=0.423),
+            robomasterpy.ChassisStatus(static=False, uphill=True, downhill=False, on_slope=False, pick_up=False, slip=False, impact_x=False, impact_y=False, impact_z=False, roll_over=False, hill_static=False),
+            robomasterpy.GimbalAttitude(pitch=-0.3, yaw=-0.1),
+            robomasterpy.ChassisPosition(x=0.001, y=0.0, z=None),
+            robomasterpy.ChassisAttitude(pitch=-0.892, roll=-0.115, yaw=0.422),
+        ], ans)
+
+        ans = listener._parse('gimbal push attitude -0.300 -0.100 ;')
+        self.assertEqual([robomasterpy.GimbalAttitude(pitch=-0.3, yaw=-0.1)], ans)
+
+        ans = listener._parse('  gimbal push  attitude -0.300\t-0.100 ;; ')
+        self.assertEqual([robomasterpy.GimbalAttitude(pitch=-0.3, yaw=-0.1)], ans)
+
+        ans = listener._parse('chassis push position 0.1 0.2 ; attitude 1 2 3')
+        self.assertEqual([
+            robomasterpy.ChassisPosition(x=0.1, y=0.2, z=None),
+            robomasterpy.ChassisAttitude(pitch=1.0, roll=2.0, yaw=3.0),
+        ], ans)
+
+        self.assertRaises(AssertionError, listener._parse, '')
+        self.assertRaises(AssertionError, listener._parse, 'whatever')
+        self.assertRaises(ValueError, listener._parse, 'chassis push whatever 1 2 ;')
+        self.assertRaises(AssertionError, listener._parse, 'chassis push status 0 1 0 0 0 0 0 0 0 0 x ;')
+
+    @patch('robomasterpy.framework._MSG_DONTWAIT', 0x40)
+    def test__intake_datagrams(self):
+        listener = build_listener(framework.PushListener, 'push-listener', queue.Queue())
+        listener._conn.recv_into.side_effect = feed(b'gimbal push attitude -0.3 -0.1 ;', b'chassis push position 0.1 0.2 ;', BlockingIOError())
+        self.assertEqual(['gimbal push attitude -0.3 -0.1 ;', 'chassis push position 0.1 0.2 ;'], listener._intake_datagrams())
+
+    def test__outlet_wait_on_full(self):
+        out = MagicMock()
+        out.put_nowait.side_effect = queue.Full()
+        out.put.side_effect = [queue.Full(), None]
+        listener = build_listener(framework.PushListener, 'push-listener', out)
+        listener._outlet(1)
+        out.put_nowait.assert_called_once_with(1)
+        self.assertEqual(2, out.put.call_count)
+
+    @patch('robomasterpy.framework._MSG_DONTWAIT', 0x40)
+    def test_work_batch(self):
+        datagrams = (b'gimbal push attitude -0.3 -0.1 ;', b'chassis push position 0.1 0.2 ;', BlockingIOError())
+
+        out = queue.Queue()
+        listener = build_listener(framework.PushListener, 'push-listener', out, batch=True)
+        listener._conn.recv_into.side_effect = feed(*datagrams)
+        listener.work()
+        self.assertEqual([
+            robomasterpy.GimbalAttitude(pitch=-0.3, yaw=-0.1),
+            robomasterpy.ChassisPosition(x=0.1, y=0.2, z=None),
+        ], out.get_nowait())
+        self.assertTrue(out.empty())
+
+        listener = build_listener(framework.PushListener, 'push-listener', out)
+        listener._conn.recv_into.side_effect = feed(*datagrams)
+        listener.work()
+        self.assertEqual(robomasterpy.GimbalAttitude(pitch=-0.3, yaw=-0.1), out.get_nowait())
+        self.assertEqual(robomasterpy.ChassisPosition(x=0.1, y=0.2, z=None), out.get_nowait())
+
+    def test__outlet_drop_on_full(self):
+        # pushes wait for downstream unless users opt in to dropping
+        self.assertFalse(framework.PushListener.DROP_ON_FULL)
+        out = queue.Queue(1)
+        listener = build_listener(DroppingPushListener, 'dropping-push-listener', out)
+        listener._outlet(1)
+        with self.assertLogs(listener.logger, level='DEBUG'):
+            listener._outlet(2)
+        self.assertEqual(1, out.get_nowait())
+        self.assertTrue(out.empty())
+        self.assertEqual(1, listener.dropped)
+
+        # nothing is logged for drops when debug logging is off
+        with patch('robomasterpy.framework.LOG_LEVEL', logging.INFO):
+            listener = build_listener(DroppingPushListener, 'quiet-dropping-push-listener', out)
+        out.put(3)
+        with patch.object(listener.logger, 'debug') as debug:
+            listener._outlet(4)
+        debug.assert_not_called()
+        self.assertEqual(1, listener.dropped)
 
 
 class TestEventListener(TestCase):
     def test__parse(self):
-        with patch('robomasterpy.framework.EventListener.__init__', return_value=None):
-            # noinspection PyArgumentList
-            listener = framework.EventListener()
-            ans = listener._parse('armor event hit 1 0 ;armor event hit 2 1 ;armor event hit 3 0 ;armor event hit 4 0 ;sound event applause 2 ;sound event applause 3 ;sound event applause 2 ;')
-            self.assertEqual([
-                robomasterpy.ArmorHitEvent(index=1, type=0),
-                robomasterpy.ArmorHitEvent(index=2, type=1),
-                robomasterpy.ArmorHitEvent(index=3, type=0),
-                robomasterpy.ArmorHitEvent(index=4, type=0),
-                robomasterpy.SoundApplauseEvent(count=2),
-                robomasterpy.SoundApplauseEvent(count=3),
-                robomasterpy.SoundApplauseEvent(count=2),
-            ], ans)
-
-            ans = listener._parse('sound event applause 2 ;')
-            self.assertEqual([
-                robomasterpy.SoundApplauseEvent(count=2),
-            ], ans)
-
-            self.assertRaises(AssertionError, listener._parse, '')
-            self.assertRaises(AssertionError, listener._parse, 'whatever')
+        listener = build_listener(framework.EventListener, 'event-listener', queue.Queue(), '127.0.0.1')
+        ans = listener._parse('armor event hit 1 0 ;armor event hit 2 1 ;armor event hit 3 0 ;armor event hit 4 0 ;sound event applause 2 ;sound event applause 3 ;sound event applause 2 ;')
+        self.assertEqual([
+            robomasterpy.ArmorHitEvent(index=1, type=0),
+            robomasterpy.ArmorHitEvent(index=2, type=1),
+            robomasterpy.ArmorHitEvent(index=3, type=0),
+            robomasterpy.ArmorHitEvent(index=4, type=0),
+            robomasterpy.SoundApplauseEvent(count=2),
+            robomasterpy.SoundApplauseEvent(count=3),
+            robomasterpy.SoundApplauseEvent(count=2),
+        ], ans)
+
+        ans = listener._parse('sound event applause 2 ;')
+        self.assertEqual([
+            robomasterpy.SoundApplauseEvent(count=2),
+        ], ans)
+
+        self.assertRaises(AssertionError, listener._parse, '')
+        self.assertRaises(AssertionError, listener._parse, 'whatever')
+        self.assertRaises(ValueError, listener._parse, 'armor event whatever 1 2 ;')
+
+    def test__intake_records(self):
+        listener = build_listener(framework.EventListener, 'event-listener', queue.Queue(), '127.0.0.1')
+        listener._conn.recv_into.side_effect = feed(b'armor event hit 1 0 ;armor eve', b'nt hit 2 1', b' ;sound event applause 2 ;', b'')
+        self.assertEqual('armor event hit 1 0 ;', listener._intake_records())
+        self.assertEqual('armor event hit 2 1 ;sound event applause 2 ;', listener._intake_records())
+        if hasattr(socket, 'TCP_QUICKACK'):
+            # quick ACK is re-armed after every recv, the kernel clears it
+            listener._conn.setsockopt.assert_called_with(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            self.assertEqual(4, listener._conn.setsockopt.call_args_list.count(((socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1),)))
+        self.assertRaises(EOFError, listener._intake_records)
+
+
+class TestVision(TestCase):
+    def test_work_skips_stale_frames(self):
+        out = MagicMock()
+        out.full.side_effect = [True, True, False]
+        processing = MagicMock(return_value='processed')
+        vision, cap = build_vision('vision', out, '127.0.0.1', processing)
+        cap.grab.return_value = True
+        cap.retrieve.return_value = (True, 'frame')
+        vision.work()
+        self.assertEqual(3, cap.grab.call_count)
+        cap.retrieve.assert_called_once()
+        processing.assert_called_once_with(frame='frame', logger=vision.logger)
+        out.put_nowait.assert_called_once_with('processed')
+
+    @skipUnless(hasattr(cv, 'CAP_PROP_HW_ACCELERATION'), 'OpenCV 4.5.2 or later is required')
+    @patch('robomasterpy.framework.cv.VideoCapture')
+    def test__open_capture(self, video_capture):
+        framework.Vision('vision', None, '192.168.2.1', MagicMock())
+        video_capture.assert_called_with('tcp://192.168.2.1:40921', cv.CAP_FFMPEG, [cv.CAP_PROP_HW_ACCELERATION, cv.VIDEO_ACCELERATION_ANY])
+        video_capture.return_value.set.assert_called_with(cv.CAP_PROP_BUFFERSIZE, 1)
+        SoftwareVision('vision', None, '192.168.2.1', MagicMock())
+        video_capture.assert_called_with('tcp://192.168.2.1:40921')
+
+    def test_work_reuse_frame(self):
+        vision, cap = build_vision('vision', None, '127.0.0.1', MagicMock(return_value=None), reuse_frame=True)
+        cap.grab.return_value = True
+        cap.retrieve.return_value = (True, 'frame')
+        vision.work()
+        vision.work()
+        self.assertEqual([((None,),), (('frame',),)], cap.retrieve.call_args_list)
+
+
+class Counter(framework.Worker):
+    def __init__(self, name, out):
+        super().__init__(name, out, None, ('', 0), None)
+        self._count = 0
+
+    def work(self):
+        self._count += 1
+        self._outlet(self._count)
+        time.sleep(0.01)
+
+
+class ClosingCounter(Counter):
+    def work(self):
+        # a signal closes the worker in the middle of work()
+        self.close()
+        self._out.put_nowait('after close')
+
+
+class TestWorker(TestCase):
+    def setUp(self):
+        # workers built in the main thread install their own signal handlers
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+
+    def test_close_on_signal(self):
+        worker = Counter('signaled-counter', None)
+        os.kill(os.getpid(), signal.SIGTERM)
+        self.assertTrue(worker.closed)
+
+    @patch('socket.socket')
+    def test_signal_during_construction(self, mock_socket):
+        mock_socket.return_value.connect.side_effect = lambda address: os.kill(os.getpid(), signal.SIGTERM)
+        worker = framework.Worker('signaled-worker', None, 'tcp', ('127.0.0.1', 1), 1)
+        self.assertTrue(worker.closed)
+        mock_socket.return_value.close.assert_called()
+
+        mock_socket.return_value.connect.side_effect = OSError()
+        self.assertRaises(OSError, framework.Worker, 'unreachable-worker', None, 'tcp', ('127.0.0.1', 1), 1)
+
+    @patch('socket.socket')
+    def test_receive_buffer_log_needs_debug(self, mock_socket):
+        mock_socket.return_value.getsockopt.return_value = framework.Worker.RCVBUF_SIZE
+        with self.assertLogs('debug-worker', level='DEBUG'):
+            framework.Worker('debug-worker', None, 'udp', ('', 0), None)
+        mock_socket.return_value.getsockopt.assert_called_once_with(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+        # neither the syscall nor the record happens when debug logging is off
+        mock_socket.return_value.getsockopt.reset_mock()
+        with patch('robomasterpy.framework.LOG_LEVEL', logging.INFO), \
+                patch.object(logging.Logger, 'debug') as debug:
+            framework.Worker('quiet-worker', None, 'udp', ('', 0), None)
+        mock_socket.return_value.getsockopt.assert_not_called()
+        debug.assert_not_called()
+
+    @patch('robomasterpy.framework.cv.destroyAllWindows')
+    @patch('robomasterpy.framework.cv.VideoCapture')
+    def test_signal_during_vision_construction(self, video_capture, _):
+        def open_capture(*args):
+            os.kill(os.getpid(), signal.SIGTERM)
+            return MagicMock()
+
+        video_capture.side_effect = open_capture
+        vision = framework.Vision('signaled-vision', None, '127.0.0.1', MagicMock())
+        self.assertTrue(vision.closed)
+
+    @patch('robomasterpy.framework.RECV_BUF_SIZE', 8)
+    def test__intake_records_exceeds_buffer(self):
+        with socket.socket() as server:
+            server.bind(('127.0.0.1', 0))
+            server.listen(1)
+            worker = framework.Worker('oversized', None, 'tcp', server.getsockname(), 1)
+            conn, _ = server.accept()
+            with conn, worker:
+                conn.sendall(b'123456789;')
+                self.assertRaisesRegex(ConnectionError, 'exceeds receive buffer', worker._intake_records)
+
+    def test_close_out_after_loop(self):
+        out = robomasterpy.CTX.Queue()
+        worker = ClosingCounter('closing-counter', out)
+        worker()
+        self.assertTrue(worker.closed)
+        self.assertTrue(out._closed)
+
+    def test_logger_handler_once(self):
+        first = Counter('logging-counter', None)
+        second = Counter('logging-counter', None)
+        self.assertIs(first.logger, second.logger)
+        self.assertEqual(1, len(first.logger.handlers))
+        self.assertFalse(first.logger.propagate)
+
+    def test_close_out(self):
+        out = robomasterpy.CTX.Queue()
+        with Counter('counter', out) as worker:
+            pass
+        self.assertTrue(worker.closed)
+        self.assertTrue(out._closed)
+
+        out = robomasterpy.CTX.Queue()
+        worker = Counter('counter', out)
+        worker._owns_out = False
+        worker.close()
+        out.put(1)
+        self.assertEqual(1, out.get(timeout=2))
+
+
+class TestHub(TestCase):
+    def test_thread_backend(self):
+        hub = framework.Hub()
+        out = queue.Queue()
+        hub.worker(Counter, 'counter', args=(out,), backend='thread')
+        thread = hub._workers[0]
+        thread.start()
+        self.assertEqual(1, out.get(timeout=2))
+        self.assertEqual(2, out.get(timeout=2))
+        hub.close()
+        self.assertFalse(thread.is_alive())
+
+    def test_context_manager(self):
+        with framework.Hub() as hub:
+            self.assertFalse(hub._closed)
+        self.assertTrue(hub._closed)
+
+    def test_start_method(self):
+        self.assertIs(robomasterpy.CTX, framework.Hub()._ctx)
+        self.assertEqual('spawn', framework.Hub('spawn')._ctx.get_start_method())
+        self.assertIs(robomasterpy.CTX, framework.Hub('whatever')._ctx)
+
+    def test_unknown_backend(self):
+        hub = framework.Hub()
+        self.assertRaises(ValueError, hub.worker, Counter, 'counter', backend='whatever')
+
+
+class TestDrainQueues(TestCase):
+    def test_empty(self):
+        self.assertEqual({}, framework.drain_queues((), None))
+
+    def test_pipe_backed(self):
+        q1, q2 = robomasterpy.CTX.Queue(), robomasterpy.CTX.Queue()
+        self.assertEqual({}, framework.drain_queues((q1, q2), 0.01))
+        q2.put(1)
+        q2.put(2)
+        # the second item may still be in the feeder thread
+        drained = framework.drain_queues((q1, q2), 2)
+        self.assertEqual([q2], list(drained))
+        items = drained[q2]
+        while len(items) < 2:
+            items += framework.drain_queues((q1, q2), 2)[q2]
+        self.assertEqual([1, 2], items)
+
+    def test_polling_fallback(self):
+        q1, q2 = queue.Queue(), queue.Queue()
+        self.assertEqual({}, framework.drain_queues((q1, q2), 0.01))
+        q1.put('a')
+        self.assertEqual({q1: ['a']}, framework.drain_queues((q1, q2), 2))
+
+
+class TestMeasure(TestCase):
+    def test_distance_decomposition(self):
+        forward, lateral, degree = robomasterpy.measure.distance_decomposition(1000, 2.0)
+        self.assertEqual(27.0, degree)
+        self.assertAlmostEqual(2.0 * math.cos(math.radians(27)), forward)
+        self.assertAlmostEqual(2.0 * math.sin(math.radians(27)), lateral)
+        for expected, actual in zip((forward, lateral, degree), robomasterpy.measure.distance_decomposition(1000.0, 2.0, 1280.0, 96.0)):
+            self.assertAlmostEqual(expected, actual)
+
+        forward, lateral, degree = robomasterpy.measure.distance_decomposition(480, 1.0, 640, 60)
+        self.assertEqual(15.0, degree)
+        self.assertAlmostEqual(math.cos(math.radians(15)), forward)
+
+    def test_distance_decomposition_batch(self):
+        pixel_x = [0, 320, 640, 1000, 1280]
+        distance = [1.0, 2.5, 3.0, 0.5, 4.0]
+        forward, lateral, degree = robomasterpy.measure.distance_decomposition_batch(pixel_x, distance)
+        for i in range(len(pixel_x)):
+            expected = robomasterpy.measure.distance_decomposition(pixel_x[i], distance[i])
+            self.assertAlmostEqual(expected[0], forward[i])
+            self.assertAlmostEqual(expected[1], lateral[i])
+            # the angle only goes through arithmetic, so it equals the scalar version bit for bit
+            self.assertEqual(expected[2], degree[i])